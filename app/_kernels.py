@@ -0,0 +1,78 @@
+"""Numeric kernels for the basket revaluation hot path.
+
+The kernels work on flat float64 vectors (one entry per position) and are compiled
+with Numba when it is installed (``pip install .[jit]``). Without Numba they run as
+plain NumPy expressions, which keeps the Lambda image lean.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - exercised when the jit extra is not installed
+    njit = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def jit(func=None, *, fastmath: bool | set[str] = True):
+    """Compile ``func`` with Numba when it is installed, otherwise return it unchanged.
+
+    Use bare (``@jit``) or with a restricted set of fastmath flags (``@jit(fastmath={...})``).
+    """
+
+    def decorate(func):
+        if njit is None:
+            return func
+        return njit(cache=True, fastmath=fastmath, error_model="numpy")(func)
+
+    return decorate if func is None else decorate(func)
+
+
+@jit
+def basket_price_kernel(weights: np.ndarray, fx: np.ndarray, prices: np.ndarray) -> tuple[float, np.ndarray]:
+    """Return the basket price and per-position contributions ``weight * fx * price``."""
+
+    contributions = weights * fx * prices
+    return contributions.sum(), contributions
+
+
+@jit
+def apply_variation_kernel(
+    prices: np.ndarray,
+    fx: np.ndarray,
+    weights: np.ndarray,
+    notional: np.ndarray,
+    factors: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Scale spots by ``factors``.
+
+    Returns the varied prices, prices in base currency, contributions and quantities.
+    ``notional`` holds the per-position notional in base currency; quantities for
+    positions without a notional are meaningless and must be ignored by the caller.
+    """
+
+    varied_prices = prices * factors
+    prices_in_base = varied_prices * fx
+    contributions = weights * prices_in_base
+    quantities = notional / prices_in_base
+    return varied_prices, prices_in_base, contributions, quantities
+
+
+def warm_up() -> None:
+    """Compile (or load from cache) the kernels so the JIT cost stays off the request path."""
+
+    if njit is None:
+        return
+    sample = np.ones(1, dtype=np.float64)
+    basket_price_kernel(sample, sample, sample)
+    apply_variation_kernel(sample, sample, sample, sample, sample)
+    logger.debug("Basket kernels compiled")
+
+
+warm_up()
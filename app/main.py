@@ -5,38 +5,62 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
-import random
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from decimal import Decimal
 from pathlib import Path
-from typing import Iterable
+from typing import AsyncIterator, Iterable
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+import orjson
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from mangum import Mangum
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from .models import BasketPricingResponse, BasketRequest, BasketState, BasketStreamPayload
+from ._kernels import apply_variation_kernel, basket_price_kernel
+from .models import (
+    BasketPositionBreakdown,
+    BasketPricingResponse,
+    BasketRequest,
+    BasketState,
+)
 from .services.basket_cache import BasketCache, CachedBasket
-from .services.market_data import MarketDataProvider
-from .services.pricing import FxRateProvider, PricingService
-from .services.spot_providers import SpotProvider
+from .services.broadcaster import PriceBroadcaster
+from .services.market_data import MarketDataProvider, MarketQuote
+from .services.pricing import FxRateProvider, PricingService, quantize_float
+from .services.spot_providers import QuoteCache, SpotProvider
 
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def json_default(value: object) -> object:
+    """orjson fallback for the types our models carry besides natively supported ones."""
+
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value: object) -> bytes:
+    return orjson.dumps(value, default=json_default, option=orjson.OPT_UTC_Z)
+
+
+@dataclass(slots=True)
 class AppResources:
     market_data_provider: MarketDataProvider
     fx_provider: FxRateProvider
     pricing_service: PricingService
     basket_cache: BasketCache
     spot_provider: SpotProvider
+    quote_cache: QuoteCache
     stream_interval: float
-    index_template: str
+    token_prefix: str
+    index_html: bytes
+    broadcaster: PriceBroadcaster
 
 
 allow_origins = [o.strip() for o in os.getenv("CORS_ALLOW_ORIGINS", "*").split(",") if o.strip()]
@@ -50,6 +74,15 @@ def configure_cors(app: FastAPI) -> None:
     )
 
 
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST, headers={"Cache-Control": "no-store"})
+
+
+def add_metrics_route(app: FastAPI) -> None:
+    # Plain Starlette route: no dependency resolution or response model for scrapes.
+    app.router.add_route("/metrics", metrics_endpoint, methods=["GET"])
+
+
 def parse_stream_interval(raw_value: str | None) -> float:
     if raw_value is None:
         return 1.0
@@ -60,34 +93,61 @@ def parse_stream_interval(raw_value: str | None) -> float:
     return max(parsed, 0.1)
 
 
+def render_index(token_prefix: str) -> bytes:
+    """Render the landing page once; the token is fixed for the process lifetime."""
+
+    index_template = (Path(__file__).resolve().parent / "templates" / "index.html").read_text(encoding="utf-8")
+    return index_template.replace("{{TOKEN_PREFIX}}", token_prefix).encode("utf-8")
+
+
 def build_app_resources() -> AppResources:
     market_data_provider = MarketDataProvider()
     fx_provider = FxRateProvider()
     pricing_service = PricingService(market_data_provider, fx_provider)
     basket_cache = BasketCache()
     eodhd_token = os.getenv("EODHD_API_TOKEN")
-    spot_provider = SpotProvider(api_token=eodhd_token)
     stream_interval = parse_stream_interval(os.getenv("BASKET_STREAM_INTERVAL"))
-    index_template = (Path(__file__).resolve().parent / "templates" / "index.html").read_text(encoding="utf-8")
+    spot_provider = SpotProvider(api_token=eodhd_token)
+    # Quotes must expire before the fastest producer tick, or that tick would see no change
+    # and fall back to the full interval.
+    quote_cache = QuoteCache(spot_provider, ttl=min_stream_delay(stream_interval) / 2)
+    token_prefix = eodhd_token[:5] if eodhd_token else "(unset)"
+    index_html = render_index(token_prefix)
+    broadcaster = PriceBroadcaster(
+        lambda: stream_basket_events(
+            basket_cache=basket_cache,
+            spot_provider=quote_cache,
+            pricing_service=pricing_service,
+            stream_interval=stream_interval,
+        ),
+        snapshot=lambda: snapshot_event(basket_cache),
+    )
     return AppResources(
         market_data_provider=market_data_provider,
         fx_provider=fx_provider,
         pricing_service=pricing_service,
         basket_cache=basket_cache,
         spot_provider=spot_provider,
+        quote_cache=quote_cache,
         stream_interval=stream_interval,
-        index_template=index_template,
+        token_prefix=token_prefix,
+        index_html=index_html,
+        broadcaster=broadcaster,
     )
 
 
-def add_shutdown_handler(app: FastAPI, spot_provider: SpotProvider) -> None:
+def add_shutdown_handler(app: FastAPI, resources: AppResources) -> None:
     async def shutdown_event() -> None:
-        await spot_provider.aclose()
+        await resources.broadcaster.aclose()
+        await resources.spot_provider.aclose()
 
     app.add_event_handler("shutdown", shutdown_event)
 
 
 def initialize_seed_basket(resources: AppResources) -> None:
+    # Mangum runs the lifespan on every Lambda invocation; only seed the cache once.
+    if resources.basket_cache.get("seed-basket") is not None:
+        return
     seed_payload = {
         "basket_name": "Seed Basket",
         "base_currency": "USD",
@@ -108,73 +168,61 @@ def initialize_seed_basket(resources: AppResources) -> None:
 
 
 def to_state(entity: CachedBasket) -> BasketState:
-    payload = entity.pricing.model_dump()
-    return BasketState(
-        **payload,
-        basket_id=entity.basket_id,
-        created_at=entity.created_at,
-        updated_at=entity.updated_at,
-    )
-
-
-def apply_random_spot_variation(state: BasketState) -> BasketState:
-    """Apply random variation to spot prices: spot * (1 + 0.1 * (dice - 0.5))"""
-    from decimal import Decimal
-
-    # Create a copy of the state with varied prices
-    varied_positions = []
-    basket_price = Decimal("0")
+    state = entity.memo.get("state")
+    if state is None:
+        # The pricing was validated when it was produced; reuse its field values as-is.
+        state = BasketState.model_construct(
+            **dict(entity.pricing),
+            basket_id=entity.basket_id,
+            created_at=entity.created_at,
+            updated_at=entity.updated_at,
+        )
+        entity.memo["state"] = state
+    return state
 
-    for position in state.positions:
-        dice = random.random()  # Random float between 0 and 1
-        variation_factor = Decimal(str(1 + 0.1 * (dice - 0.5)))
 
-        # Apply variation to the spot price
-        varied_price = position.price * variation_factor
-        varied_price_in_base = position.price_in_base * variation_factor
-        varied_contribution = position.weight * varied_price_in_base
+def state_json(entity: CachedBasket) -> bytes:
+    encoded = entity.memo.get("json")
+    if encoded is None:
+        encoded = dumps(to_state(entity).model_dump(mode="python"))
+        entity.memo["json"] = encoded
+    return encoded
 
-        # Update basket price
-        basket_price += varied_contribution
 
-        # Calculate varied position notional and quantity if applicable
-        varied_position_notional = None
-        varied_quantity = None
-        if position.position_notional is not None and position.normalized_weight is not None:
-            varied_position_notional = state.total_notional * position.normalized_weight if state.total_notional else None
-            if varied_position_notional and varied_price_in_base != 0:
-                varied_quantity = varied_position_notional / varied_price_in_base
+def apply_random_spot_variation(entity: CachedBasket) -> BasketState:
+    """Apply random variation to spot prices: spot * (1 + 0.1 * (dice - 0.5))"""
+    state = to_state(entity)
+    positions = state.positions
+    factors = 1 + 0.1 * (np.random.random(len(positions)) - 0.5)
+    varied_prices, prices_in_base, contributions, quantities = apply_variation_kernel(
+        entity.prices, entity.fx_to_base, entity.weights, entity.notionals, factors
+    )
 
-        # Create varied position
+    varied_positions = []
+    for index, position in enumerate(positions):
+        quantity = None
+        if position.position_notional is not None and prices_in_base[index] != 0:
+            quantity = quantize_float(float(quantities[index]))
         varied_positions.append(
-            position.model_copy(
-                update={
-                    "price": varied_price,
-                    "price_in_base": varied_price_in_base,
-                    "contribution": varied_contribution,
-                    "position_notional": varied_position_notional,
-                    "quantity": varied_quantity,
+            BasketPositionBreakdown.model_construct(
+                **{
+                    **position.__dict__,
+                    "price": quantize_float(float(varied_prices[index])),
+                    "price_in_base": quantize_float(float(prices_in_base[index])),
+                    "contribution": quantize_float(float(contributions[index])),
+                    "quantity": quantity,
                 }
             )
         )
 
-    # Return updated state with varied prices
     return state.model_copy(
         update={
-            "basket_price": basket_price,
+            "basket_price": quantize_float(float(contributions.sum())),
             "positions": varied_positions,
         }
     )
 
 
-def collect_tickers(baskets: Iterable[CachedBasket]) -> set[str]:
-    symbols: set[str] = set()
-    for basket in baskets:
-        for position in basket.definition.positions:
-            symbols.add(position.ticker.upper())
-    return symbols
-
-
 def make_price_request(pricing_service: PricingService):
     def price_request(request: BasketRequest) -> BasketPricingResponse:
         try:
@@ -187,76 +235,165 @@ def make_price_request(pricing_service: PricingService):
     return price_request
 
 
-def heartbeat_event() -> dict:
-    payload = BasketStreamPayload(
-        as_of=datetime.now(timezone.utc),
-        baskets=[],
-    )
-    return {"event": "heartbeat", "data": payload.model_dump_json()}
+def heartbeat_event() -> bytes:
+    return b"event: heartbeat\ndata: " + dumps({"as_of": datetime.now(timezone.utc), "baskets": []}) + b"\n\n"
 
 
-def build_overrides_map(basket: CachedBasket, quotes: dict[str, float]) -> dict[str, float]:
-    return {
-        position.ticker.upper(): quotes[position.ticker.upper()]
-        for position in basket.definition.positions
-        if position.ticker.upper() in quotes
-    }
+def build_overrides_map(basket: CachedBasket, quotes: dict[str, MarketQuote]) -> dict[str, MarketQuote]:
+    """Fill the basket's reusable overrides buffer; the result is only valid until the next call.
+
+    ``quotes`` may only hold the moved tickers: every other position keeps its last live
+    spot from the cached vectors rather than falling back to the static provider price.
+    """
+    buffer = basket.overrides_buffer
+    buffer.clear()
+    for index, ticker in enumerate(basket.upper_tickers):
+        quote = quotes.get(ticker)
+        if quote is None:
+            quote = MarketQuote(price=float(basket.prices[index]), currency=basket.currencies[index])
+        buffer[ticker] = quote
+    return buffer
+
+
+def revalue_basket(
+    basket: CachedBasket,
+    quotes: dict[str, MarketQuote],
+    basket_cache: BasketCache,
+    pricing_service: PricingService,
+) -> CachedBasket | None:
+    """Apply the latest spots to ``basket`` using its cached position vectors.
+
+    Only the spot leg moves between ticks, so the basket price is shifted by
+    ``sum(weight * fx * (new - previous))`` over the moved positions. A full re-pricing
+    is only needed when a quote comes back in a different currency.
+    """
+    prices = basket.prices.copy()
+    moves: dict[int, float] = {}
+    for index, ticker in enumerate(basket.upper_tickers):
+        quote = quotes.get(ticker)
+        if quote is None:
+            continue
+        if quote.currency != basket.currencies[index]:
+            pricing = pricing_service.price_basket(
+                basket.definition,
+                market_overrides=build_overrides_map(basket, quotes),
+            )
+            basket_cache.update_pricing(basket.basket_id, pricing)
+            return basket_cache.get(basket.basket_id)
+        spot = float(quote.price)
+        if spot != prices[index]:
+            prices[index] = spot
+            moves[index] = spot
+
+    if not moves:
+        return basket
+
+    delta, _ = basket_price_kernel(basket.weights, basket.fx_to_base, prices - basket.prices)
+    basket_value = basket.basket_value + float(delta)
+    pricing = pricing_service.reprice_positions(
+        basket.pricing,
+        moves,
+        basket_value,
+        weights=basket.weights,
+        fx_to_base=basket.fx_to_base,
+        notionals=basket.notionals,
+    )
+    basket_cache.update_pricing(basket.basket_id, pricing, prices=prices, basket_value=basket_value)
+    return basket_cache.get(basket.basket_id)
 
 
 def refresh_baskets(
     snapshot: Iterable[CachedBasket],
-    quotes: dict[str, float],
+    quotes: dict[str, MarketQuote],
     basket_cache: BasketCache,
     pricing_service: PricingService,
-) -> list[BasketState]:
-    updates: list[BasketState] = []
+    updates: list[CachedBasket] | None = None,
+) -> list[CachedBasket]:
+    """Revalue ``snapshot`` and return the refreshed baskets.
+
+    ``updates`` may be passed to reuse a list across ticks; it is cleared first.
+    """
+    if updates is None:
+        updates = []
+    updates.clear()
     for basket in snapshot:
-        overrides_map = build_overrides_map(basket, quotes)
         try:
-            pricing = pricing_service.price_basket(
-                basket.definition,
-                market_overrides=overrides_map,
-            )
+            refreshed = revalue_basket(basket, quotes, basket_cache, pricing_service)
         except Exception as exc:  # pragma: no cover - defensive logging
             logger.warning("Failed to refresh basket %s: %s", basket.basket_id, exc)
             continue
 
-        basket_cache.update_pricing(basket.basket_id, pricing)
-        refreshed = basket_cache.get(basket.basket_id)
         if refreshed is not None:
-            updates.append(to_state(refreshed))
+            updates.append(refreshed)
     return updates
 
 
-def prices_event(updates: list[BasketState]) -> dict:
-    payload = BasketStreamPayload(
-        as_of=datetime.now(timezone.utc),
-        baskets=updates,
-    )
-    return {"event": "prices", "data": payload.model_dump_json()}
+def prices_event(updates: list[CachedBasket]) -> bytes:
+    # Splice the per-basket JSON memos instead of re-serializing a BasketStreamPayload.
+    as_of = dumps(datetime.now(timezone.utc))
+    baskets = b",".join(state_json(item) for item in updates)
+    return b'event: prices\ndata: {"as_of":' + as_of + b',"baskets":[' + baskets + b"]}\n\n"
+
+
+def snapshot_event(basket_cache: BasketCache) -> bytes | None:
+    """Full ``prices`` frame for a new subscriber; the shared producer only sends changes."""
+
+    baskets = basket_cache.list()
+    return prices_event(baskets) if baskets else None
+
+
+def min_stream_delay(stream_interval: float) -> float:
+    """Shortest pause the producer takes between two ticks."""
+
+    return max(0.1, stream_interval * 0.5)
+
+
+def next_stream_delay(stream_interval: float, changed: int, total: int) -> float:
+    """Poll faster while more than half of the quotes are moving between ticks."""
+
+    if changed > total // 2:
+        return min_stream_delay(stream_interval)
+    return stream_interval
 
 
 async def stream_basket_events(
     basket_cache: BasketCache,
-    spot_provider: SpotProvider,
+    spot_provider: SpotProvider | QuoteCache,
     pricing_service: PricingService,
     stream_interval: float,
-) -> Iterable[dict]:
+) -> AsyncIterator[bytes]:
+    last_quotes: dict[str, MarketQuote] = {}
+    last_revision = -1
+    updates: list[CachedBasket] = []
     try:
         while True:
-            snapshot = basket_cache.list()
-            tickers = collect_tickers(snapshot)
-            if not snapshot or not tickers:
+            tickers = basket_cache.all_tickers()
+            if not tickers:
                 yield heartbeat_event()
                 await asyncio.sleep(stream_interval)
                 continue
 
             quotes = await spot_provider.get_quotes(tickers)
-            updates = refresh_baskets(snapshot, quotes, basket_cache, pricing_service)
+            changed = {ticker: quote for ticker, quote in quotes.items() if last_quotes.get(ticker) != quote}
+            last_quotes = quotes
+            revision = basket_cache.revision
+            if not changed and revision == last_revision:
+                yield heartbeat_event()
+                await asyncio.sleep(stream_interval)
+                continue
+
+            # Baskets added or replaced since the last tick have not seen the current quotes yet;
+            # otherwise only the baskets holding a moved ticker are revalued.
+            if revision != last_revision:
+                moved, stale = quotes, basket_cache.list()
+            else:
+                moved, stale = changed, basket_cache.baskets_for(changed)
+            last_revision = revision
+            refresh_baskets(stale, moved, basket_cache, pricing_service, updates)
             yield prices_event(updates)
-            await asyncio.sleep(stream_interval)
-    except asyncio.CancelledError:  # pragma: no cover - triggered on disconnect
-        logger.debug("Basket SSE client disconnected")
+            await asyncio.sleep(next_stream_delay(stream_interval, len(changed), len(quotes)))
+    except asyncio.CancelledError:  # pragma: no cover - triggered when the last client leaves
+        logger.debug("Basket price producer stopped")
         raise
 
 
@@ -264,20 +401,20 @@ def register_routes(app: FastAPI, resources: AppResources) -> None:
     basket_cache = resources.basket_cache
     pricing_service = resources.pricing_service
     market_data_provider = resources.market_data_provider
-    spot_provider = resources.spot_provider
-    stream_interval = resources.stream_interval
-    index_template = resources.index_template
+    quote_cache = resources.quote_cache
+    broadcaster = resources.broadcaster
+    index_html = resources.index_html
     price_request = make_price_request(pricing_service)
 
     @app.post("/baskets", response_model=BasketState, status_code=201)
-    def create_basket(request: BasketRequest) -> BasketState:
+    async def create_basket(request: BasketRequest) -> BasketState:
         basket_id = uuid4().hex
         pricing = price_request(request)
         cached = basket_cache.upsert(basket_id, request, pricing)
         return to_state(cached)
 
     @app.put("/baskets/{basket_id}", response_model=BasketState)
-    def replace_basket(basket_id: str, request: BasketRequest) -> BasketState:
+    async def replace_basket(basket_id: str, request: BasketRequest) -> BasketState:
         if basket_cache.get(basket_id) is None:
             raise HTTPException(status_code=404, detail=f"Basket {basket_id} not found")
         pricing = price_request(request)
@@ -285,23 +422,25 @@ def register_routes(app: FastAPI, resources: AppResources) -> None:
         return to_state(cached)
 
     @app.patch("/baskets/{basket_id}", response_model=BasketState)
-    def patch_basket(basket_id: str, request: BasketRequest) -> BasketState:
-        return replace_basket(basket_id, request)
+    async def patch_basket(basket_id: str, request: BasketRequest) -> BasketState:
+        return await replace_basket(basket_id, request)
 
     @app.get("/baskets", response_model=list[BasketState])
-    def list_baskets() -> list[BasketState]:
-        return [apply_random_spot_variation(to_state(item)) for item in basket_cache.list()]
+    async def list_baskets() -> list[BasketState]:
+        return [apply_random_spot_variation(item) for item in basket_cache.list()]
 
     @app.post("/pricing/basket", response_model=BasketPricingResponse)
-    def post_basket_price(request: BasketRequest) -> BasketPricingResponse:
+    async def post_basket_price(request: BasketRequest) -> BasketPricingResponse:
         return price_request(request)
 
     @app.get("/market-data/{ticker}")
-    def get_market_quote(ticker: str) -> dict:
-        try:
-            quote = market_data_provider.get_quote(ticker)
-        except KeyError as exc:
-            raise HTTPException(status_code=404, detail=str(exc)) from exc
+    async def get_market_quote(ticker: str) -> dict:
+        quote = quote_cache.peek(ticker)
+        if quote is None:
+            try:
+                quote = market_data_provider.get_quote(ticker)
+            except KeyError as exc:
+                raise HTTPException(status_code=404, detail=str(exc)) from exc
         return {
             "ticker": ticker.upper(),
             "price": float(quote.price),
@@ -309,55 +448,63 @@ def register_routes(app: FastAPI, resources: AppResources) -> None:
         }
 
     @app.get("/", response_class=HTMLResponse)
-    def get_index() -> HTMLResponse:
-        token = os.getenv("EODHD_API_TOKEN") or ""
-        token_prefix = token[:5] if token else "(unset)"
-        content = index_template.replace("{{TOKEN_PREFIX}}", token_prefix)
-        return HTMLResponse(content)
-
-    @app.get("/metrics")
-    def get_metrics() -> Response:
-        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    async def get_index() -> HTMLResponse:
+        return HTMLResponse(index_html)
 
     @app.get("/baskets/stream")
     async def stream() -> StreamingResponse:
-        async def sse_gen():
-            async for event in stream_basket_events(
-                basket_cache=basket_cache,
-                spot_provider=spot_provider,
-                pricing_service=pricing_service,
-                stream_interval=stream_interval,
-            ):
-                event_name = event.get("event")
-                data = event.get("data") or ""
-                if event_name:
-                    yield f"event: {event_name}\n"
-                yield f"data: {data}\n\n"
-
         headers = {
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            # Frames are tiny and latency sensitive; keep compression middleware off the stream.
+            "Content-Encoding": "identity",
         }
-        return StreamingResponse(sse_gen(), media_type="text/event-stream", headers=headers)
+        return StreamingResponse(broadcaster.events(), media_type="text/event-stream", headers=headers)
+
+
+def install_uvloop() -> None:
+    """Use uvloop for the event loop when it is available (Mangum and plain asyncio runs)."""
+
+    try:
+        import uvloop
+    except ImportError:  # pragma: no cover - optional speed-up
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 
 def create_app() -> FastAPI:
     """Application factory to allow testability."""
 
+    install_uvloop()
+
     app = FastAPI(
         title="Delta-One Custom Basket Pricing API",
         version="0.0.0",
         description="Compute indicative prices and exposures for bespoke baskets.",
     )
 
+    add_metrics_route(app)
     configure_cors(app)
     resources = build_app_resources()
-    add_shutdown_handler(app, resources.spot_provider)
+    add_shutdown_handler(app, resources)
     register_routes(app, resources)
-    initialize_seed_basket(resources)
+    app.add_event_handler("startup", lambda: initialize_seed_basket(resources))
 
     return app
 
 
 app = create_app()
 lambda_handler = Mangum(app)
+
+
+if __name__ == "__main__":  # pragma: no cover - local server entry point
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8080,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=75,
+    )
@@ -6,55 +6,45 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Annotated, List
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, field_validator
 from pydantic.functional_serializers import PlainSerializer
 
 DecimalNumber = Annotated[Decimal, PlainSerializer(lambda v: float(v), return_type=float, when_used="json")]
+Currency = Annotated[str, StringConstraints(min_length=3, max_length=3, to_upper=True)]
 
 
 class MarketDataPoint(BaseModel):
     """Represents a single spot price for an instrument."""
 
+    model_config = ConfigDict(frozen=True)
+
     ticker: str = Field(..., description="Instrument identifier")
     price: DecimalNumber = Field(..., gt=0, description="Spot price in the quote currency")
-    currency: str = Field("USD", min_length=3, max_length=3)
-
-    @field_validator("currency")
-    @classmethod
-    def uppercase_currency(cls, value: str) -> str:
-        return value.upper()
+    currency: Currency = "USD"
 
 
 class FxRate(BaseModel):
     """Foreign exchange rate definition."""
 
-    base_currency: str = Field(..., min_length=3, max_length=3)
-    quote_currency: str = Field(..., min_length=3, max_length=3)
-    rate: DecimalNumber = Field(..., gt=0)
+    model_config = ConfigDict(frozen=True)
 
-    @field_validator("base_currency", "quote_currency")
-    @classmethod
-    def uppercase_currency(cls, value: str) -> str:
-        return value.upper()
+    base_currency: Currency
+    quote_currency: Currency
+    rate: DecimalNumber = Field(..., gt=0)
 
 
 class BasketPositionRequest(BaseModel):
     """Definition of a single basket constituent."""
 
+    model_config = ConfigDict(frozen=True)
+
     ticker: str = Field(..., description="Instrument identifier")
     weight: DecimalNumber = Field(..., description="Relative weight of the constituent")
-    currency: str = Field(
+    currency: Currency = Field(
         default="USD",
         description="Currency of the indicative price (defaults to USD)",
-        min_length=3,
-        max_length=3,
     )
 
-    @field_validator("currency")
-    @classmethod
-    def uppercase_currency(cls, value: str) -> str:
-        return value.upper()
-
     @field_validator("weight")
     @classmethod
     def validate_weight(cls, value: Decimal) -> Decimal:
@@ -66,8 +56,10 @@ class BasketPositionRequest(BaseModel):
 class BasketRequest(BaseModel):
     """Payload accepted by the pricing endpoint."""
 
+    model_config = ConfigDict(frozen=True)
+
     basket_name: str = Field(..., description="Client facing basket identifier")
-    base_currency: str = Field("USD", min_length=3, max_length=3)
+    base_currency: Currency = "USD"
     positions: List[BasketPositionRequest] = Field(..., min_length=1)
     notional: DecimalNumber | None = Field(
         default=None,
@@ -75,15 +67,12 @@ class BasketRequest(BaseModel):
         description="Optional target notional for the basket in base currency",
     )
 
-    @field_validator("base_currency")
-    @classmethod
-    def uppercase_currency(cls, value: str) -> str:
-        return value.upper()
-
 
 class BasketPositionBreakdown(BaseModel):
     """Evaluation outcome for a single constituent."""
 
+    model_config = ConfigDict(frozen=True)
+
     ticker: str
     weight: DecimalNumber
     normalized_weight: DecimalNumber | None = None
@@ -100,6 +89,8 @@ class BasketPositionBreakdown(BaseModel):
 class BasketPricingResponse(BaseModel):
     """Response returned to clients after pricing."""
 
+    model_config = ConfigDict(frozen=True)
+
     basket_name: str
     base_currency: str
     weight_sum: DecimalNumber
@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
-from threading import RLock
-from typing import Dict, Iterable, List
+from itertools import count
+from operator import attrgetter
+from threading import Lock
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
 
+import numpy as np
+
+from .._kernels import basket_price_kernel
 from ..models import BasketPricingResponse, BasketRequest
 
 
-@dataclass
+@dataclass(slots=True)
 class CachedBasket:
     """Represents a basket stored in memory with its latest valuation."""
 
@@ -19,77 +24,182 @@ class CachedBasket:
     pricing: BasketPricingResponse
     created_at: datetime
     updated_at: datetime
+    # Serialized views of ``pricing`` (state model, JSON), shared by every copy of the
+    # same revision and replaced whenever the pricing changes.
+    memo: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    # Column-wise (SoA) view of the priced positions used for incremental revaluation.
+    upper_tickers: Tuple[str, ...] = ()
+    currencies: Tuple[str, ...] = ()
+    weights: np.ndarray = field(default_factory=lambda: np.empty(0), repr=False, compare=False)
+    fx_to_base: np.ndarray = field(default_factory=lambda: np.empty(0), repr=False, compare=False)
+    prices: np.ndarray = field(default_factory=lambda: np.empty(0), repr=False, compare=False)
+    notionals: np.ndarray = field(default_factory=lambda: np.empty(0), repr=False, compare=False)
+    basket_value: float = 0.0
+    # Scratch mapping reused by every tick that needs per-basket quote overrides.
+    overrides_buffer: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    # Cache-wide insertion rank, kept across updates; orders ``BasketCache.list()``.
+    sequence: int = field(default=0, repr=False, compare=False)
+
+    def index_pricing(self) -> None:
+        """Rebuild the position vectors from ``pricing``."""
+
+        positions = self.pricing.positions
+        self.upper_tickers = tuple(position.ticker.upper() for position in positions)
+        self.currencies = tuple(position.price_currency for position in positions)
+        self.weights = np.array([float(position.weight) for position in positions], dtype=np.float64)
+        self.fx_to_base = np.array([float(position.fx_rate_to_base) for position in positions], dtype=np.float64)
+        self.prices = np.array([float(position.price) for position in positions], dtype=np.float64)
+        self.notionals = np.array(
+            [float(position.position_notional or 0) for position in positions], dtype=np.float64
+        )
+        self.basket_value = float(basket_price_kernel(self.weights, self.fx_to_base, self.prices)[0])
+
+
+class _Shard:
+    """One slice of the cache: a published mapping plus the lock serializing its writers."""
+
+    __slots__ = ("lock", "items")
 
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.items: Dict[str, CachedBasket] = {}
 
-class BasketCache:
-    """Thread-safe in-memory cache for baskets."""
 
-    def __init__(self) -> None:
-        self._items: Dict[str, CachedBasket] = {}
-        self._lock = RLock()
+class BasketCache:
+    """Thread-safe in-memory cache for baskets, optimised for read-mostly access.
+
+    Cached records are never mutated once published: writers build a new
+    ``CachedBasket`` (sharing the frozen definition/pricing models) and swap it in, and
+    inserts/removals publish a new shard mapping (copy-on-write). Readers therefore take
+    no lock at all; ``get()``/``list()`` return the published records, which callers must
+    treat as read-only apart from their ``memo``/``overrides_buffer`` scratch space.
+    Writers are serialized per shard (``hash(basket_id) & mask``), so operations on
+    different baskets do not contend; ``list()`` and ``ids()`` restore insertion order
+    from a cache-wide sequence number.
+    """
+
+    def __init__(self, shard_count: int = 16) -> None:
+        if shard_count < 1 or shard_count & (shard_count - 1):
+            raise ValueError("shard_count must be a power of two")
+        self._shards = [_Shard() for _ in range(shard_count)]
+        self._shard_mask = shard_count - 1
+        # Guards the cross-shard ticker index and revision; always taken after a shard lock.
+        self._index_lock = Lock()
+        # Ids of the cached baskets referencing each (uppercased) ticker, and its published keys.
+        # Entries are replaced, never mutated, so lock-free readers see a consistent set.
+        self._ticker_baskets: Dict[str, FrozenSet[str]] = {}
+        self._tickers: FrozenSet[str] = frozenset()
+        # Bumped whenever a basket definition is added, replaced or removed.
+        self._revision = 0
+        self._sequence = count()
 
     def _now(self) -> datetime:
         return datetime.now(tz=timezone.utc)
 
+    def _shard(self, basket_id: str) -> _Shard:
+        return self._shards[hash(basket_id) & self._shard_mask]
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    def _reindex(self, basket_id: str, removed: Iterable[str], added: Iterable[str]) -> None:
+        added = set(added)
+        with self._index_lock:
+            index = self._ticker_baskets
+            for ticker in set(removed) - added:
+                baskets = index[ticker] - {basket_id}
+                if baskets:
+                    index[ticker] = baskets
+                else:
+                    del index[ticker]
+            for ticker in added:
+                index[ticker] = index.get(ticker, frozenset()) | {basket_id}
+            self._tickers = frozenset(index)
+            self._revision += 1
+
     def upsert(self, basket_id: str, definition: BasketRequest, pricing: BasketPricingResponse) -> CachedBasket:
-        with self._lock:
+        shard = self._shard(basket_id)
+        with shard.lock:
             now = self._now()
-            definition_copy = definition.model_copy(deep=True)
-            pricing_copy = pricing.model_copy(deep=True)
-            if basket_id in self._items:
-                cached = self._items[basket_id]
-                cached.definition = definition_copy
-                cached.pricing = pricing_copy
-                cached.updated_at = now
+            previous = shard.items.get(basket_id)
+            if previous is not None:
+                cached = replace(previous, definition=definition, pricing=pricing, updated_at=now, memo={})
+                cached.index_pricing()
+                shard.items[basket_id] = cached
+                self._reindex(basket_id, previous.upper_tickers, cached.upper_tickers)
                 return cached
             cached = CachedBasket(
                 basket_id=basket_id,
-                definition=definition_copy,
-                pricing=pricing_copy,
+                definition=definition,
+                pricing=pricing,
                 created_at=now,
                 updated_at=now,
+                sequence=next(self._sequence),
             )
-            self._items[basket_id] = cached
+            cached.index_pricing()
+            shard.items = {**shard.items, basket_id: cached}
+            self._reindex(basket_id, (), cached.upper_tickers)
             return cached
 
-    def update_pricing(self, basket_id: str, pricing: BasketPricingResponse) -> None:
-        with self._lock:
-            cached = self._items.get(basket_id)
-            if cached is None:
+    def update_pricing(
+        self,
+        basket_id: str,
+        pricing: BasketPricingResponse,
+        *,
+        prices: np.ndarray | None = None,
+        basket_value: float | None = None,
+    ) -> None:
+        """Store a new valuation for an existing basket.
+
+        When the caller already holds the revalued spot vector and basket value (spot-only
+        moves), they are stored as-is; otherwise the vectors are rebuilt from ``pricing``.
+        """
+
+        shard = self._shard(basket_id)
+        with shard.lock:
+            previous = shard.items.get(basket_id)
+            if previous is None:
                 return
-            cached.pricing = pricing.model_copy(deep=True)
-            cached.updated_at = self._now()
+            cached = replace(previous, pricing=pricing, updated_at=self._now(), memo={})
+            if prices is not None and basket_value is not None:
+                cached.prices = prices
+                cached.basket_value = basket_value
+            else:
+                cached.index_pricing()
+            shard.items[basket_id] = cached
 
     def get(self, basket_id: str) -> CachedBasket | None:
-        with self._lock:
-            cached = self._items.get(basket_id)
-            if cached is None:
-                return None
-            return CachedBasket(
-                basket_id=cached.basket_id,
-                definition=cached.definition.model_copy(deep=True),
-                pricing=cached.pricing.model_copy(deep=True),
-                created_at=cached.created_at,
-                updated_at=cached.updated_at,
-            )
+        return self._shard(basket_id).items.get(basket_id)
 
     def remove(self, basket_id: str) -> None:
-        with self._lock:
-            self._items.pop(basket_id, None)
+        shard = self._shard(basket_id)
+        with shard.lock:
+            cached = shard.items.get(basket_id)
+            if cached is None:
+                return
+            shard.items = {key: item for key, item in shard.items.items() if key != basket_id}
+            self._reindex(basket_id, cached.upper_tickers, ())
+
+    def all_tickers(self) -> FrozenSet[str]:
+        """Return the uppercased tickers referenced by any cached basket."""
+
+        return self._tickers
+
+    def baskets_for(self, tickers: Iterable[str]) -> List[CachedBasket]:
+        """Return the cached baskets holding at least one of the (uppercased) ``tickers``."""
+
+        index = self._ticker_baskets
+        basket_ids: Set[str] = set()
+        for ticker in tickers:
+            basket_ids.update(index.get(ticker, ()))
+        baskets = (self.get(basket_id) for basket_id in basket_ids)
+        return [basket for basket in baskets if basket is not None]
 
     def list(self) -> List[CachedBasket]:
-        with self._lock:
-            return [
-                CachedBasket(
-                    basket_id=item.basket_id,
-                    definition=item.definition.model_copy(deep=True),
-                    pricing=item.pricing.model_copy(deep=True),
-                    created_at=item.created_at,
-                    updated_at=item.updated_at,
-                )
-                for item in self._items.values()
-            ]
+        items = [item for shard in self._shards for item in list(shard.items.values())]
+        items.sort(key=attrgetter("sequence"))
+        return items
 
     def ids(self) -> Iterable[str]:
-        with self._lock:
-            return list(self._items.keys())
+        return [item.basket_id for item in self.list()]
@@ -0,0 +1,97 @@
+"""Fan-out of a single server-sent events producer to many subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Set
+
+
+logger = logging.getLogger(__name__)
+
+# Published to every subscriber when the producer stops on its own; ends their streams.
+_CLOSED = object()
+
+
+class PriceBroadcaster:
+    """Run one producer loop and publish each of its events to every subscriber queue.
+
+    The producer is started lazily with the first subscriber and cancelled when the last
+    one leaves, so pricing and quote fetches happen once per tick regardless of how many
+    clients are connected. Slow subscribers lose their oldest pending event. If the
+    producer fails or finishes, every current stream ends and the next subscriber starts
+    a fresh producer.
+
+    The producer only publishes what changed, so ``snapshot`` (when given) is called on
+    each subscribe and its result, unless ``None``, is queued first for that subscriber
+    alone.
+    """
+
+    def __init__(
+        self,
+        producer: Callable[[], AsyncIterator[object]],
+        max_pending: int = 16,
+        snapshot: Callable[[], object | None] | None = None,
+    ) -> None:
+        self._producer = producer
+        self._max_pending = max_pending
+        self._snapshot = snapshot
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._max_pending)
+        if self._snapshot is not None:
+            initial = self._snapshot()
+            if initial is not None:
+                queue.put_nowait(initial)
+        self._subscribers.add(queue)
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers:
+            self._stop()
+
+    async def events(self) -> AsyncIterator[object]:
+        queue = self.subscribe()
+        try:
+            while True:
+                event = await queue.get()
+                if event is _CLOSED:
+                    return
+                yield event
+        finally:
+            self.unsubscribe(queue)
+
+    async def aclose(self) -> None:
+        # Open streams end on the close marker instead of waiting on their queue forever.
+        self._publish(_CLOSED)
+        self._subscribers.clear()
+        self._stop()
+
+    def _stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.get_loop().is_closed():
+            task.cancel()
+
+    async def _run(self) -> None:
+        try:
+            async for event in self._producer():
+                self._publish(event)
+        except Exception:
+            logger.exception("Price producer failed; closing subscriber streams")
+        self._publish(_CLOSED)
+
+    def _publish(self, event: object) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
@@ -4,6 +4,11 @@ import numpy as np
 from dataclasses import dataclass, field
 from typing import Dict, Optional
 
+from .._kernels import jit
+
+# Pas de "nnan"/"ninf" : la boucle teste explicitement les NaN (prix manquants).
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
 @dataclass
 class BasketFees:
     structuring_fee_bps: float = 0.0        # annuel, ex: 5 => 5 bps/an
@@ -18,6 +23,66 @@ class BasketParameters:
     dividend_yield_ann: Dict[str, float] = field(default_factory=dict)  # ex: {"AAPL": 0.005}
     withholding_by_symbol: Dict[str, float] = field(default_factory=dict)  # prioritaire sur default_withholding
 
+# Grille quotidienne (jours de bourse) : dt = 1/252, donc les frais "bps * 252 * dt"
+# se réduisent à leur taux en bps et seul le dividende garde le facteur dt.
+DT = 1.0 / 252.0
+
+
+# ---------- Mechanics ----------
+@jit(fastmath=_FASTMATH)
+def _dividend_daily(nav_prev, w_prev, div_rate):
+    """Approximation dividendes: yield annuel * prix * dt ; retenue à la source ; converti en PnL NAV.
+
+    ``div_rate`` = yield * dt * (1 - retenue), précalculé par symbole.
+    """
+    # Longs perçoivent, shorts paient (approx. scrip/comp) -> signe = signe du poids
+    # |w * NAV| * signe(w) = |NAV| * w : le signe ne dépend pas de celui de la NAV
+    return np.abs(nav_prev) * (div_rate * w_prev).sum()
+
+
+@jit(fastmath=_FASTMATH)
+def _borrow_daily(nav_prev, w_prev, borrow_rate):
+    """Borrow fee pour shorts, appliqué sur la valeur short à t-1."""
+    return nav_prev * (borrow_rate * np.minimum(w_prev, 0.0)).sum()
+
+
+@jit(fastmath=_FASTMATH)
+def _run_kernel(returns, div_rate, borrow_rate, fund, structuring_rate, nav, W, pnl):
+    """Boucle path-dependent sur ndarrays ; remplit ``nav``, ``W`` et ``pnl[:, :5]`` à partir de la ligne 0.
+
+    ``returns[t-1]`` = P(t)/P(t-1) - 1 (0 pour les prix manquants) ; ``fund`` est le taux quotidien.
+    """
+    n_dates, n_symbols = W.shape
+    for t in range(1, n_dates):
+        w_prev = W[t - 1]
+        nav_prev = nav[t - 1]
+        r_t = returns[t - 1]
+
+        # PnL prix = somme(weight_{t-1} * return sous-jacent * NAV_{t-1})
+        price_pnl = (w_prev * r_t * nav_prev).sum()
+        div_pnl = _dividend_daily(nav_prev, w_prev, div_rate)
+        # Financing sur le notionnel du panier (NAV) à t-1 ; coût => signe négatif
+        fund_pnl = - nav_prev * fund[t]
+        borr_pnl = _borrow_daily(nav_prev, w_prev, borrow_rate)
+        # Structuring fee sur NAV t-1
+        struct_pnl = - nav_prev * structuring_rate
+
+        pnl[t, 0] = price_pnl
+        pnl[t, 1] = div_pnl
+        pnl[t, 2] = fund_pnl
+        pnl[t, 3] = borr_pnl
+        pnl[t, 4] = struct_pnl
+        nav[t] = nav_prev + price_pnl + div_pnl + fund_pnl + borr_pnl + struct_pnl
+
+        # Poids driftent avec les prix (pas de rebalance automatique)
+        # Valeurs par ligne à t : V_i(t) = w_prev_i * NAV_{t-1} * (P_i(t)/P_i(t-1))
+        line_vals_t = w_prev * nav_prev * (1.0 + r_t)
+        total = line_vals_t.sum()
+        for i in range(n_symbols):
+            w = line_vals_t[i] / total
+            W[t, i] = 0.0 if np.isnan(w) else w
+
+
 class CustomBasketPricer:
     """
     Delta-one custom basket pricer
@@ -44,21 +109,40 @@ class CustomBasketPricer:
         params: Optional[BasketParameters] = None,
         fees: Optional[BasketFees] = None,
     ):
-        self.prices = prices.sort_index()
+        self.prices = prices if prices.index.is_monotonic_increasing else prices.sort_index()
         self.symbols = list(prices.columns)
         self._check_weights(weights0)
 
+        # Rendements quotidiens calculés une fois ; prix manquant => rendement nul
+        P = self.prices.to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = P[1:] / P[:-1] - 1.0
+        self._returns = np.where(np.isnan(returns), 0.0, returns)
+
         self.weights = pd.DataFrame(index=self.prices.index, columns=self.symbols, dtype=float)
         self.weights.iloc[0] = self._normalize(pd.Series(weights0, index=self.symbols).fillna(0.0))
 
         self.params = params or BasketParameters()
         self.fees = fees or BasketFees()
 
+        # Constantes par symbole (invariantes dans la boucle journalière)
+        self._dy_arr = np.array([self.params.dividend_yield_ann.get(s, 0.0) for s in self.symbols], dtype=np.float64)
+        self._wh_arr = np.array(
+            [self.params.withholding_by_symbol.get(s, self.fees.default_withholding) for s in self.symbols],
+            dtype=np.float64,
+        )
+        # borrow par symbole si dispo, sinon 0
+        self._borrow_bps_arr = np.array([self.fees.borrow_fee_bps.get(s, 0.0) for s in self.symbols], dtype=np.float64) / 10_000.0
+        # Taux journaliers pliés une fois (grille quotidienne, voir DT)
+        self._div_rate_arr = self._dy_arr * DT * (1.0 - self._wh_arr)
+        self._structuring_rate = self.fees.structuring_fee_bps / 10_000.0
+
         # funding rate to daily float series
         if isinstance(funding_rate, pd.Series):
-            self.funding_rate = funding_rate.reindex(self.prices.index).fillna(method="ffill").fillna(0.0)
+            self.funding_rate = funding_rate.reindex(self.prices.index).ffill().fillna(0.0)
         else:
             self.funding_rate = pd.Series(funding_rate, index=self.prices.index, dtype=float)
+        self._fund_arr = self.funding_rate.to_numpy(dtype=np.float64, copy=False)
 
         self.nav = pd.Series(index=self.prices.index, dtype=float)
         self.nav.iloc[0] = self.params.initial_nav
@@ -68,6 +152,15 @@ class CustomBasketPricer:
             columns=["Price", "Dividend", "Funding", "Borrow", "Structuring", "RebalanceCost"]
         )
 
+        # Position de chaque date (résolution O(1) dans rebalance)
+        self._pos = {date: i for i, date in enumerate(self.prices.index)}
+
+        # Buffers de la boucle run() (positionnels, réécrits dans les DataFrames à la fin)
+        n_dates = len(self.prices.index)
+        self._nav_arr = np.empty(n_dates, dtype=np.float64)
+        self._weights_arr = np.zeros((n_dates, len(self.symbols)), dtype=np.float64)
+        self._pnl_arr = np.zeros((n_dates, len(self.pnl_breakdown.columns)), dtype=np.float64)
+
     # ---------- Helpers ----------
     def _check_weights(self, w: Dict[str, float]):
         extra = set(w.keys()) - set(self.symbols)
@@ -79,118 +172,61 @@ class CustomBasketPricer:
         s = w.sum()
         return w if np.isclose(s, 1.0) else (w / s if s != 0 else w)
 
-    # ---------- Mechanics ----------
-    def _dividend_daily(self, date, prev_date, w_prev) -> float:
-        """Approximation dividendes: yield annuel * prix * dt ; retenue à la source ; converti en PnL NAV."""
-        if prev_date is None:
-            return 0.0
-        dt = self._dt(prev_date, date)
-        dy = pd.Series({s: self.params.dividend_yield_ann.get(s, 0.0) for s in self.symbols})
-        wh = pd.Series({s: self.params.withholding_by_symbol.get(s, self.fees.default_withholding) for s in self.symbols})
-
-        # Valeur du panier à t-1 (NAV * poids)
-        basket_val_prev = self.nav.loc[prev_date]
-        position_val_prev = w_prev * basket_val_prev
-
-        # Dividendes bruts ~ rendement * valeur exposée * dt
-        gross = (dy * position_val_prev.abs()) * dt
-        net = gross * (1.0 - wh)
-        # Longs perçoivent, shorts paient (approx. scrip/comp) -> signe = signe du poids
-        signed = net * np.sign(w_prev)
-        return signed.sum()
-
-    def _funding_daily(self, date, prev_date) -> float:
-        """Financing sur le notionnel du panier (NAV) à t-1."""
-        if prev_date is None:
-            return 0.0
-        dt_rate = self.funding_rate.loc[date]  # déjà quotidien
-        basket_val_prev = self.nav.loc[prev_date]
-        return - basket_val_prev * dt_rate  # coût => signe négatif
-
-    def _borrow_daily(self, date, prev_date, w_prev) -> float:
-        """Borrow fee pour shorts (bps/an ⇒ quotidien), appliqué sur la valeur short à t-1."""
-        if prev_date is None:
-            return 0.0
-        dt = self._dt(prev_date, date)
-        basket_val_prev = self.nav.loc[prev_date]
-        short_val = (w_prev.clip(upper=0.0).abs()) * basket_val_prev
-        # par symbole si dispo, sinon 0
-        bps = pd.Series({s: self.fees.borrow_fee_bps.get(s, 0.0) for s in self.symbols}) / 10_000.0
-        return - (short_val * (bps * (252*dt))).sum()
-
-    def _structuring_daily(self, date, prev_date) -> float:
-        """Structuring fee en bps/an => quotidien sur NAV t-1."""
-        if prev_date is None:
-            return 0.0
-        dt = self._dt(prev_date, date)
-        basket_val_prev = self.nav.loc[prev_date]
-        return - basket_val_prev * (self.fees.structuring_fee_bps / 10_000.0) * (252 * dt)
-
-    def _price_pnl(self, date, prev_date, w_prev) -> float:
-        """PnL prix = somme(weight_{t-1} * return sous-jacent * NAV_{t-1})."""
-        if prev_date is None:
-            return 0.0
-        basket_val_prev = self.nav.loc[prev_date]
-        r = (self.prices.loc[date] / self.prices.loc[prev_date] - 1.0).fillna(0.0)
-        return (w_prev * r * basket_val_prev).sum()
-
-    @staticmethod
-    def _dt(prev_date, date) -> float:
-        # dt ~ 1 jour de bourse => 1/252 ; si calendrier irrégulier, on peut raffiner via jours réels/365
-        return 1.0 / 252.0
-
     # ---------- Public API ----------
     def run(self) -> None:
-        """Calcule NAV et PnL breakdown sans rebalancements supplémentaires."""
-        prev_date = None
-        for date in self.prices.index:
-            if prev_date is None:
-                prev_date = date
-                continue
-
-            w_prev = self.weights.loc[prev_date].fillna(0.0)
-
-            price_pnl = self._price_pnl(date, prev_date, w_prev)
-            div_pnl = self._dividend_daily(date, prev_date, w_prev)
-            fund_pnl = self._funding_daily(date, prev_date)
-            borr_pnl = self._borrow_daily(date, prev_date, w_prev)
-            struct_pnl = self._structuring_daily(date, prev_date)
+        """Calcule NAV et PnL breakdown sans rebalancements supplémentaires.
 
-            total = price_pnl + div_pnl + fund_pnl + borr_pnl + struct_pnl
-            self.pnl_breakdown.loc[date, ["Price", "Dividend", "Funding", "Borrow", "Structuring"]] = \
-                [price_pnl, div_pnl, fund_pnl, borr_pnl, struct_pnl]
+        La boucle travaille sur des ndarrays (prix, poids, NAV, PnL) dans ``_run_kernel``,
+        compilé par Numba si disponible, et ne réécrit les DataFrames qu'une seule fois à la fin.
+        """
+        dates = self.prices.index
+        n_dates = len(dates)
+        if n_dates < 2:
+            return
 
-            self.nav.loc[date] = self.nav.loc[prev_date] + total
+        W = self._weights_arr
+        W[0] = self.weights.iloc[0].fillna(0.0).to_numpy(dtype=np.float64)
+        nav = self._nav_arr
+        nav[0] = self.nav.iat[0]
+        pnl = self._pnl_arr
+        pnl[:] = self.pnl_breakdown.to_numpy(dtype=np.float64)
 
-            # Poids driftent avec les prix (pas de rebalance automatique)
-            # Valeurs par ligne à t : V_i(t) = w_prev_i * NAV_{t-1} * (P_i(t)/P_i(t-1))
-            line_vals_t = w_prev * self.nav.loc[prev_date] * (self.prices.loc[date] / self.prices.loc[prev_date]).fillna(1.0)
-            self.weights.loc[date] = (line_vals_t / line_vals_t.sum()).fillna(0.0)
+        _run_kernel(
+            self._returns, self._div_rate_arr, self._borrow_bps_arr, self._fund_arr,
+            self._structuring_rate, nav, W, pnl,
+        )
 
-            prev_date = date
+        self.nav = pd.Series(nav, index=dates, dtype=float)
+        self.weights = pd.DataFrame(W, index=dates, columns=self.symbols)
+        self.pnl_breakdown = pd.DataFrame(pnl, index=dates, columns=self.pnl_breakdown.columns)
 
     def rebalance(self, date, target_weights: Dict[str, float]) -> None:
         """
         Rebalance aux poids cibles (normalisés) à 'date'.
         Coût d'exécution = exec_cost_bps * turnover_notional.
         """
-        if date not in self.prices.index:
-            raise ValueError("Rebalance date must be in prices index")
+        t = self._pos.get(date)
+        if t is None:
+            # Libellés non normalisés (ex: chaîne "2024-01-05") : résolution par l'index
+            if date not in self.prices.index:
+                raise ValueError("Rebalance date must be in prices index")
+            t = self.prices.index.get_loc(date)
 
-        tw = self._normalize(pd.Series(target_weights, index=self.symbols).fillna(0.0))
-        self.weights.loc[date] = tw
+        tw = self._normalize(pd.Series(target_weights, index=self.symbols).fillna(0.0)).to_numpy(dtype=np.float64)
+        self.weights.iloc[t] = tw
 
         # turnover = 0.5 * somme(|Δw|) * NAV (approx, en valeur absolue totale échangée)
-        prev_date = self.prices.index[self.prices.index.get_loc(date) - 1] if self.prices.index.get_loc(date) > 0 else None
-        if prev_date is None:
+        if t == 0:
             return
 
-        w_prev = self.weights.loc[prev_date].fillna(0.0)
-        turnover = (tw - w_prev).abs().sum() * 0.5 * self.nav.loc[prev_date]
+        w_prev = self.weights.iloc[t - 1].fillna(0.0).to_numpy(dtype=np.float64)
+        nav_prev = self.nav.iat[t - 1]
+        turnover = np.abs(tw - w_prev).sum() * 0.5 * nav_prev
         cost = - turnover * (self.fees.exec_cost_bps / 10_000.0)
         # Applique le coût sur la NAV le jour du rebalance
-        self.nav.loc[date] = (self.nav.loc[date] if pd.notna(self.nav.loc[date]) else self.nav.loc[prev_date]) + cost
-        self.pnl_breakdown.loc[date, "RebalanceCost"] += cost
+        nav_t = self.nav.iat[t]
+        self.nav.iat[t] = (nav_t if pd.notna(nav_t) else nav_prev) + cost
+        self.pnl_breakdown.iat[t, self.pnl_breakdown.columns.get_loc("RebalanceCost")] += cost
 
     def results(self) -> dict:
         out = {
@@ -4,15 +4,21 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
+from types import MappingProxyType
 from typing import Dict, Iterable, Mapping, Tuple
 
+import numpy as np
+
 from ..models import MarketDataPoint
 
 
 @dataclass(frozen=True)
 class MarketQuote:
-    price: Decimal
+    # Live quotes polled from EODHD carry a float spot; consumers go through float().
+    price: Decimal | float
     currency: str
+    # Set on the placeholder spots SpotProvider makes up when no upstream quote exists.
+    synthetic: bool = False
 
 
 DEFAULT_QUOTES: Dict[str, MarketQuote] = {
@@ -37,11 +43,32 @@ class MarketDataProvider:
         self._quotes: Dict[str, MarketQuote] = {
             symbol.upper(): quote for symbol, quote in (quotes or DEFAULT_QUOTES).items()
         }
+        self._quotes_view: Mapping[str, MarketQuote] = MappingProxyType(self._quotes)
+        self._columnar = self.build_columnar(self._quotes)
+
+    def snapshot(self) -> Mapping[str, MarketQuote]:
+        """Return a read-only view of the available market quotes."""
+
+        return self._quotes_view
 
-    def snapshot(self) -> Dict[str, MarketQuote]:
-        """Return a copy of the available market quotes."""
+    def columnar(self) -> Tuple[Mapping[str, int], np.ndarray, np.ndarray]:
+        """Return the provider quotes as ``(symbol -> row, prices, currencies)``."""
 
-        return dict(self._quotes)
+        return self._columnar
+
+    @staticmethod
+    def build_columnar(
+        quotes: Mapping[str, MarketQuote],
+    ) -> Tuple[Mapping[str, int], np.ndarray, np.ndarray]:
+        """Pack quotes into parallel float64 price and currency-code arrays.
+
+        The returned mapping gives the row of each (uppercased) symbol in both arrays.
+        """
+
+        rows = {symbol.upper(): row for row, symbol in enumerate(quotes)}
+        prices = np.fromiter((float(quote.price) for quote in quotes.values()), dtype=np.float64, count=len(quotes))
+        currencies = np.array([quote.currency for quote in quotes.values()], dtype="U3")
+        return MappingProxyType(rows), prices, currencies
 
     def _quote_from_overrides(
         self, ticker: str, overrides: Mapping[str, MarketQuote] | None
@@ -77,10 +104,14 @@ class MarketDataProvider:
 
     def merge(
         self, overrides: Mapping[str, MarketQuote] | None = None
-    ) -> Dict[str, MarketQuote]:
-        """Merge overrides with the provider snapshot."""
+    ) -> Mapping[str, MarketQuote]:
+        """Merge overrides with the provider snapshot.
 
-        merged = self.snapshot()
-        if overrides:
-            merged.update({k.upper(): v for k, v in overrides.items()})
+        Without overrides the read-only snapshot is returned as is.
+        """
+
+        if not overrides:
+            return self._quotes_view
+        merged = dict(self._quotes)
+        merged.update({k.upper(): v for k, v in overrides.items()})
         return merged
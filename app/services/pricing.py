@@ -2,19 +2,19 @@
 
 from __future__ import annotations
 
+import hashlib
 import time
 
-from decimal import Decimal, ROUND_HALF_UP, getcontext
-from typing import Dict, Mapping, Tuple
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Mapping, Sequence, Tuple
 
+import numpy as np
+import orjson
 from prometheus_client import Counter, Histogram
 
-from ..models import BasketPositionBreakdown, BasketRequest, BasketPricingResponse
+from ..models import BasketPositionBreakdown, BasketPositionRequest, BasketRequest, BasketPricingResponse
 from .market_data import MarketDataProvider, MarketQuote
 
-# Higher precision during intermediate calculations
-getcontext().prec = 28
-
 
 PRICING_REQUESTS = Counter(
     "basket_pricing_requests_total",
@@ -27,6 +27,18 @@ PRICING_DURATION = Histogram(
     "Time taken to price a basket",
 )
 
+PRICING_CACHE = Counter(
+    "basket_pricing_cache_total",
+    "Basket pricing response cache lookups",
+    ["result"],
+)
+
+
+def quantize_float(value: float, exponent: str = "0.0001") -> Decimal:
+    """Convert a float computed on the hot path back to a rounded Decimal."""
+
+    return Decimal.from_float(value).quantize(Decimal(exponent), rounding=ROUND_HALF_UP)
+
 
 class FxRateProvider:
     """In-memory FX rate provider with override support."""
@@ -43,10 +55,48 @@ class FxRateProvider:
         if rates:
             for (base, quote), rate in rates.items():
                 self._rates[(base.upper(), quote.upper())] = rate
+        # Inverses of the stored pairs, kept apart so overrides keep precedence over them
+        self._inverse_rates: Dict[Tuple[str, str], Decimal] = {
+            (quote, base): Decimal("1") / rate
+            for (base, quote), rate in self._rates.items()
+            if (quote, base) not in self._rates
+        }
+        self._currencies = frozenset(currency for pair in self._rates for currency in pair)
+        self._rates_to_cache: Dict[str, Dict[str, Decimal]] = {}
 
     def snapshot(self) -> Dict[Tuple[str, str], Decimal]:
         return dict(self._rates)
 
+    def rates_to(
+        self,
+        base_currency: str,
+        overrides: Mapping[Tuple[str, str], Decimal] | None = None,
+    ) -> Dict[str, Decimal]:
+        """Return the rate into ``base_currency`` of every currency that can be converted.
+
+        The map is resolved with the same precedence as :meth:`get_rate` and cached per
+        base currency when there are no overrides.
+        """
+
+        base = base_currency.upper()
+        if not overrides:
+            cached = self._rates_to_cache.get(base)
+            if cached is not None:
+                return cached
+        currencies = set(self._currencies)
+        currencies.add(base)
+        if overrides:
+            currencies.update(currency for pair in overrides for currency in pair)
+        rates: Dict[str, Decimal] = {}
+        for currency in currencies:
+            try:
+                rates[currency] = self.get_rate(currency, base, overrides)
+            except KeyError:
+                continue
+        if not overrides:
+            self._rates_to_cache[base] = rates
+        return rates
+
     def get_rate(
         self,
         from_currency: str,
@@ -65,21 +115,46 @@ class FxRateProvider:
         inverse_key = (quote, base)
         if overrides and inverse_key in overrides:
             return Decimal("1") / overrides[inverse_key]
-        if inverse_key in self._rates:
-            return Decimal("1") / self._rates[inverse_key]
+        if (base, quote) in self._inverse_rates:
+            return self._inverse_rates[(base, quote)]
         raise KeyError(f"No FX rate available for {base}/{quote}")
 
 
 class PricingService:
-    """Compute price and exposures for a delta-one basket."""
+    """Compute price and exposures for a delta-one basket.
+
+    Responses priced without overrides are kept for ``response_ttl`` seconds, keyed by a
+    digest of the request, so identical requests in quick succession share one result.
+    """
 
     def __init__(
         self,
         market_data_provider: MarketDataProvider,
         fx_provider: FxRateProvider,
+        *,
+        response_ttl: float = 0.5,
+        response_cache_size: int = 1024,
     ) -> None:
         self._market_data_provider = market_data_provider
         self._fx_provider = fx_provider
+        self._response_ttl = response_ttl
+        self._response_cache_size = response_cache_size
+        self._response_cache: Dict[bytes, Tuple[float, BasketPricingResponse]] = {}
+
+    @staticmethod
+    def _request_key(request: BasketRequest) -> bytes:
+        payload = orjson.dumps(request.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    def _cache_response(self, key: bytes, response: BasketPricingResponse) -> None:
+        cache = self._response_cache
+        now = time.monotonic()
+        if len(cache) >= self._response_cache_size:
+            for stale in [k for k, (stored_at, _) in cache.items() if now - stored_at >= self._response_ttl]:
+                del cache[stale]
+            while len(cache) >= self._response_cache_size:
+                del cache[next(iter(cache))]
+        cache[key] = (now, response)
 
     def price_basket(
         self,
@@ -91,85 +166,95 @@ class PricingService:
         start_time = time.perf_counter()
         status = "success"
         try:
-            market_overrides = {
-                symbol.upper(): quote for symbol, quote in (market_overrides or {}).items()
-            }
-            raw_fx_overrides = fx_overrides or {}
-            fx_overrides = {
-                (base.upper(), quote.upper()): rate for (base, quote), rate in raw_fx_overrides.items()
-            }
+            # Cache hits go through the ``finally`` below so they are counted and timed too.
+            cache_key = None
+            if self._response_ttl > 0 and not market_overrides and not fx_overrides:
+                cache_key = self._request_key(request)
+                cached = self._response_cache.get(cache_key)
+                if cached is not None and time.monotonic() - cached[0] < self._response_ttl:
+                    PRICING_CACHE.labels(result="hit").inc()
+                    return cached[1]
+                PRICING_CACHE.labels(result="miss").inc()
+
+            if market_overrides:
+                market_overrides = {symbol.upper(): quote for symbol, quote in market_overrides.items()}
+            if fx_overrides:
+                fx_overrides = {
+                    (base.upper(), quote.upper()): rate for (base, quote), rate in fx_overrides.items()
+                }
 
-            weight_sum = Decimal("0")
-            gross_weight = Decimal("0")
-            for position in request.positions:
-                weight_sum += position.weight
-                gross_weight += abs(position.weight)
+            # Float64 vectors on the hot path; Decimals are only built for the response.
+            positions = request.positions
+            weights = np.fromiter(
+                (float(position.weight) for position in positions), dtype=np.float64, count=len(positions)
+            )
+            weight_sum = float(weights.sum())
+            gross_weight = float(np.abs(weights).sum())
 
             messages = []
             weight_normalization_available = gross_weight != 0
             if not weight_normalization_available:
                 raise ValueError("The basket contains only zero weights; cannot compute price.")
-            if abs(weight_sum - Decimal("1")) > Decimal("0.0001"):
+            if abs(weight_sum - 1.0) > 0.0001:
                 messages.append(
                     "Position weights do not sum to 1. Normalized weights are based on the gross exposure."
                 )
 
-            basket_price = Decimal("0")
-            breakdown: list[BasketPositionBreakdown] = []
-
-            for position in request.positions:
-                quote = self._resolve_quote(position.ticker, market_overrides, position)
-                fx_rate = self._fx_provider.get_rate(quote.currency, request.base_currency, fx_overrides)
-                price_in_base_raw = quote.price * fx_rate
-                price_in_base = price_in_base_raw.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
-
-                raw_contribution = position.weight * price_in_base_raw
-                basket_price += raw_contribution
-
-                normalized_weight = None
-                if gross_weight != 0:
-                    normalized_weight = (position.weight / gross_weight).quantize(
-                        Decimal("0.0000001"), rounding=ROUND_HALF_UP
-                    )
-
-                position_notional = None
-                quantity = None
-                if request.notional is not None and normalized_weight is not None:
-                    position_notional = (request.notional * normalized_weight).quantize(
-                        Decimal("0.01"), rounding=ROUND_HALF_UP
-                    )
-                    if price_in_base_raw != 0:
-                        quantity = (position_notional / price_in_base_raw).quantize(
-                            Decimal("0.0001"), rounding=ROUND_HALF_UP
-                        )
-
-                breakdown.append(
-                    BasketPositionBreakdown(
-                        ticker=position.ticker,
-                        weight=position.weight,
-                        normalized_weight=normalized_weight,
-                        price=quote.price,
-                        price_currency=quote.currency,
-                        price_in_base=price_in_base,
-                        fx_rate_to_base=fx_rate,
-                        contribution=raw_contribution.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP),
-                        position_notional=position_notional,
-                        quantity=quantity,
-                        currency=quote.currency,
-                    )
-                )
+            prices, currencies, spots = self._resolve_quotes(positions, market_overrides)
+            # One FX map per request rather than one lookup per position
+            fx_map = self._fx_provider.rates_to(request.base_currency, fx_overrides)
+            for currency in currencies:
+                if currency not in fx_map:
+                    raise KeyError(f"No FX rate available for {currency}/{request.base_currency}")
+            fx = np.fromiter(
+                (float(fx_map[currency]) for currency in currencies), dtype=np.float64, count=len(currencies)
+            )
+
+            prices_in_base = prices * fx
+            contributions = weights * prices_in_base
+            basket_price = float(contributions.sum())
+            normalized_weights = [quantize_float(value, "0.0000001") for value in (weights / gross_weight).tolist()]
+
+            position_notionals: list[Decimal | None] = [None] * len(positions)
+            quantities: list[Decimal | None] = [None] * len(positions)
+            if request.notional is not None:
+                notional = float(request.notional)
+                position_notionals = [quantize_float(notional * float(value), "0.01") for value in normalized_weights]
+                for index, price_in_base in enumerate(prices_in_base.tolist()):
+                    if price_in_base != 0:
+                        quantities[index] = quantize_float(float(position_notionals[index]) / price_in_base)
 
-            basket_price = basket_price.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+            breakdown = [
+                BasketPositionBreakdown(
+                    ticker=position.ticker,
+                    weight=position.weight,
+                    normalized_weight=normalized_weights[index],
+                    price=spots[index],
+                    price_currency=currency,
+                    price_in_base=quantize_float(price_in_base),
+                    fx_rate_to_base=fx_map[currency],
+                    contribution=quantize_float(contribution),
+                    position_notional=position_notionals[index],
+                    quantity=quantities[index],
+                    currency=currency,
+                )
+                for index, (position, currency, price_in_base, contribution) in enumerate(
+                    zip(positions, currencies, prices_in_base.tolist(), contributions.tolist())
+                )
+            ]
 
-            return BasketPricingResponse(
+            response = BasketPricingResponse(
                 basket_name=request.basket_name,
                 base_currency=request.base_currency,
-                weight_sum=weight_sum,
-                basket_price=basket_price,
+                weight_sum=quantize_float(weight_sum, "0.0000001"),
+                basket_price=quantize_float(basket_price),
                 total_notional=request.notional,
                 positions=breakdown,
                 messages=messages,
             )
+            if cache_key is not None:
+                self._cache_response(cache_key, response)
+            return response
         except KeyError:
             status = "missing_market_data"
             raise
@@ -184,16 +269,89 @@ class PricingService:
             PRICING_DURATION.observe(duration)
             PRICING_REQUESTS.labels(status=status).inc()
 
-    def _resolve_quote(
+    def reprice_positions(
         self,
-        ticker: str,
-        overrides: Mapping[str, MarketQuote],
-        position,
-    ) -> MarketQuote:
-        override_price = getattr(position, "price", None)
-        if override_price is not None:
-            override_currency = getattr(position, "currency", "USD")
-            return MarketQuote(price=override_price, currency=override_currency)
-        if overrides and ticker.upper() in overrides:
-            return overrides[ticker.upper()]
-        return self._market_data_provider.get_quote(ticker, overrides)
+        pricing: BasketPricingResponse,
+        moves: Mapping[int, float],
+        basket_value: float,
+        *,
+        weights: Sequence[float],
+        fx_to_base: Sequence[float],
+        notionals: Sequence[float],
+    ) -> BasketPricingResponse:
+        """Return ``pricing`` updated for spot moves on a subset of its positions.
+
+        ``moves`` maps position indexes to their new spot in the quote currency and
+        ``basket_value`` is the already revalued, unrounded basket price. The arithmetic
+        runs on the float position vectors; Decimals are only built for the response.
+        """
+
+        positions = list(pricing.positions)
+        for index, price in moves.items():
+            position = positions[index]
+            price_in_base = price * fx_to_base[index]
+            quantity = None
+            if position.position_notional is not None and price_in_base != 0:
+                quantity = quantize_float(notionals[index] / price_in_base)
+            positions[index] = position.model_copy(
+                update={
+                    # The spot is echoed as received; only derived fields are rounded.
+                    "price": Decimal(str(price)),
+                    "price_in_base": quantize_float(price_in_base),
+                    "contribution": quantize_float(weights[index] * price_in_base),
+                    "quantity": quantity,
+                }
+            )
+
+        return pricing.model_copy(
+            update={
+                "basket_price": quantize_float(basket_value),
+                "positions": positions,
+            }
+        )
+
+    def _resolve_quotes(
+        self,
+        positions: Sequence[BasketPositionRequest],
+        overrides: Mapping[str, MarketQuote] | None,
+    ) -> Tuple[np.ndarray, list[str], list[Decimal | float]]:
+        """Return the float64 spots, quote currencies and source spots of every position.
+
+        Provider quotes are gathered from its columnar store with a single fancy-indexing
+        pass; position-level prices and ``overrides`` are then written over their rows.
+        The source spots are the quote prices as given, echoed unrounded in the response.
+        """
+
+        symbol_rows, price_column, currency_column = self._market_data_provider.columnar()
+        provider_quotes = self._market_data_provider.snapshot()
+        rows = np.zeros(len(positions), dtype=np.intp)
+        spots: list[Decimal | float] = [0.0] * len(positions)
+        replaced: Dict[int, MarketQuote] = {}
+        for index, position in enumerate(positions):
+            ticker = position.ticker.upper()
+            override_price = getattr(position, "price", None)
+            if override_price is not None:
+                replaced[index] = MarketQuote(price=override_price, currency=getattr(position, "currency", "USD"))
+                continue
+            # Overrides are already keyed by upper-case ticker.
+            quote = overrides.get(ticker) if overrides else None
+            if quote is not None:
+                replaced[index] = quote
+                continue
+            row = symbol_rows.get(ticker)
+            if row is None:
+                raise KeyError(f"No market data available for {position.ticker}")
+            rows[index] = row
+            spots[index] = provider_quotes[ticker].price
+
+        if len(replaced) == len(positions):
+            prices = np.empty(len(positions), dtype=np.float64)
+            currencies = [""] * len(positions)
+        else:
+            prices = price_column[rows]
+            currencies = currency_column[rows].tolist()
+        for index, quote in replaced.items():
+            prices[index] = float(quote.price)
+            currencies[index] = quote.currency
+            spots[index] = quote.price
+        return prices, currencies, spots
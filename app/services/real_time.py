@@ -3,15 +3,86 @@
 from __future__ import annotations
 
 import asyncio
+import importlib.util
 import logging
+import logging.handlers
 import os
-from typing import AsyncIterator, Dict, Iterable, Mapping
+import queue
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Dict, FrozenSet, Iterable, Mapping, Sequence, Tuple
 
 import httpx
+import orjson
 
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional ``h2`` package (``pip install .[http2]``).
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Connection pool shared by every client without an injected session, so TLS sessions and
+# keep-alive connections survive short-lived EODHDDelayedClient instances. httpx clients
+# are bound to the event loop they first ran on, hence one pool per loop.
+_SHARED_CLIENT: httpx.AsyncClient | None = None
+_SHARED_CLIENT_LOOP: asyncio.AbstractEventLoop | None = None
+
+
+async def _get_shared_client() -> httpx.AsyncClient:
+    global _SHARED_CLIENT, _SHARED_CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    client = _SHARED_CLIENT
+    if client is None or client.is_closed or _SHARED_CLIENT_LOOP is not loop:
+        stale, stale_loop = client, _SHARED_CLIENT_LOOP
+        client = _SHARED_CLIENT = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60.0),
+            http2=HTTP2_AVAILABLE,
+        )
+        _SHARED_CLIENT_LOOP = loop
+        if stale is not None and not stale.is_closed:
+            await _close_stale_client(stale, stale_loop)
+    return client
+
+
+async def _close_stale_client(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None) -> None:
+    """Close a pool created on another event loop before it is dropped."""
+
+    if loop is not None and loop.is_running() and loop is not asyncio.get_running_loop():
+        # Still serving another thread: its connections must be closed on that loop.
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        return
+    try:
+        await client.aclose()
+    except RuntimeError as exc:
+        # Connections whose loop is already closed cannot be shut down cleanly any more;
+        # call aclose_shared_client() before the loop ends to avoid this.
+        logger.debug("Shared EODHD client from a closed loop not fully released: %s", exc)
+
+
+async def aclose_shared_client() -> None:
+    """Close the shared connection pool; the next fetch opens a new one."""
+
+    global _SHARED_CLIENT, _SHARED_CLIENT_LOOP
+    client, _SHARED_CLIENT, _SHARED_CLIENT_LOOP = _SHARED_CLIENT, None, None
+    if client is not None:
+        await client.aclose()
+
+
+@lru_cache(maxsize=256)
+def _normalized_symbols(tickers: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Upper-cased, ``.US``-suffixed, de-duplicated and sorted symbols for ``tickers``.
+
+    Streams poll the same ticker list on every tick, so the result is memoised per tuple.
+    """
+
+    symbols = dict.fromkeys(
+        ticker.upper() if "." in ticker else f"{ticker.upper()}.US"
+        for ticker in tickers
+        if ticker and ticker.strip()
+    )
+    return tuple(sorted(symbols))
+
 
 class EODHDDelayedClient:
     """Retrieve delayed intraday quotes from the EODHD REST API."""
@@ -30,31 +101,65 @@ class EODHDDelayedClient:
         self._token = token
         self._client = session
         self._base_url = base_url.rstrip("/")
-        self._owns_client = session is None
+        # Concurrent fetches of the same symbol set share one request task.
+        self._inflight: Dict[FrozenSet[str], asyncio.Task] = {}
+        # Last entry per base symbol with the monotonic time it was received.
+        self._ttl_cache: Dict[str, Tuple[float, Mapping[str, object]]] = {}
 
     @staticmethod
     def _normalize_symbols(tickers: Iterable[str]) -> list[str]:
-        symbols: set[str] = set()
-        for ticker in tickers:
-            if not ticker or not ticker.strip():
-                continue
-            normalized = ticker.upper()
-            if "." not in normalized:
-                normalized = f"{normalized}.US"
-            symbols.add(normalized)
-        return sorted(symbols)
+        return list(_normalized_symbols(tuple(tickers)))
 
     async def _client_instance(self) -> httpx.AsyncClient:
-        if self._client is None:
-            timeout = httpx.Timeout(5.0, connect=5.0)
-            self._client = httpx.AsyncClient(timeout=timeout)
-        return self._client
+        if self._client is not None:
+            return self._client
+        return await _get_shared_client()
+
+    async def fetch_quotes(
+        self, tickers: Iterable[str], *, max_age: float = 0.0
+    ) -> Dict[str, Mapping[str, object]]:
+        """Return the latest entry per base symbol.
+
+        Entries received less than ``max_age`` seconds ago are served from memory and
+        only the remaining symbols are requested.
+        """
 
-    async def fetch_quotes(self, tickers: Iterable[str]) -> Dict[str, Mapping[str, object]]:
-        symbols = self._normalize_symbols(tickers)
+        symbols = _normalized_symbols(tuple(tickers))
         if not symbols:
             return {}
 
+        quotes: Dict[str, Mapping[str, object]] = {}
+        missing: Sequence[str] = symbols
+        if max_age > 0:
+            now = time.monotonic()
+            missing = []
+            for symbol in symbols:
+                base_symbol = symbol.split(".", 1)[0]
+                cached = self._ttl_cache.get(base_symbol)
+                if cached is not None and now - cached[0] < max_age:
+                    quotes[base_symbol] = cached[1]
+                else:
+                    missing.append(symbol)
+            if not missing:
+                return quotes
+
+        key = frozenset(missing)
+        task = self._inflight.get(key)
+        if task is None:
+            # The request runs in its own task so cancelling any one caller, the first
+            # included, leaves the others waiting on it.
+            task = asyncio.get_running_loop().create_task(self._request_quotes(missing))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None))
+        fetched = await asyncio.shield(task)
+
+        received_at = time.monotonic()
+        for base_symbol, entry in fetched.items():
+            self._ttl_cache[base_symbol] = (received_at, entry)
+        quotes.update(fetched)
+        return quotes
+
+    async def _request_quotes(self, symbols: Sequence[str]) -> Dict[str, Mapping[str, object]]:
         symbol_path = ",".join(symbols)
         client = await self._client_instance()
         params = {"api_token": self._token, "fmt": "json"}
@@ -63,7 +168,7 @@ class EODHDDelayedClient:
         try:
             response = await client.get(url, params=params)
             response.raise_for_status()
-            payload = response.json()
+            payload = orjson.loads(response.content)
         except Exception as exc:  # pragma: no cover - network errors require live API
             logger.warning("EODHD request failed: %s", exc)
             return {}
@@ -93,18 +198,29 @@ class EODHDDelayedClient:
         interval: float = 5.0,
         max_updates: int | None = None,
     ) -> AsyncIterator[Dict[str, Mapping[str, object]]]:
+        loop = asyncio.get_running_loop()
+        # Frozen once so every tick hits the same normalisation cache entry.
+        tickers = tuple(tickers)
         count = 0
+        # Polls closer together than half the interval reuse the entries already received.
         while True:
-            yield await self.fetch_quotes(tickers)
+            # Ticks are scheduled from the start of each poll, so fetch latency does not add
+            # to the cadence.
+            next_wake = loop.time() + interval
+            yield await self.fetch_quotes(tickers, max_age=interval / 2)
             count += 1
             if max_updates is not None and count >= max_updates:
                 break
-            await asyncio.sleep(interval)
+            await asyncio.sleep(max(0.0, next_wake - loop.time()))
 
     async def aclose(self) -> None:
-        if self._client is not None and self._owns_client:
-            await self._client.aclose()
-            self._client = None
+        """Release per-instance state.
+
+        Injected sessions belong to the caller and the shared pool outlives instances; it is
+        closed with :func:`aclose_shared_client`.
+        """
+
+        self._ttl_cache.clear()
 
 
 async def _demo() -> None:
@@ -121,8 +237,27 @@ async def _demo() -> None:
                 logger.info("%s -> %s", symbol, price)
     finally:
         await client.aclose()
+        await aclose_shared_client()
+
+
+def _start_log_listener() -> logging.handlers.QueueListener:
+    """Route log records through a bounded queue so the event loop never blocks on stdout."""
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    records: queue.Queue = queue.Queue(maxsize=10_000)
+    queue_handler = logging.handlers.QueueHandler(records)
+    # The message is rendered once on the queue side; the listener adds the time and level.
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    listener = logging.handlers.QueueListener(records, stream_handler)
+    listener.start()
+    return listener
 
 
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
-    asyncio.run(_demo())
+    log_listener = _start_log_listener()
+    try:
+        asyncio.run(_demo())
+    finally:
+        log_listener.stop()
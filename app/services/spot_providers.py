@@ -2,18 +2,64 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
-import random
+import math
+import time
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Iterable, Mapping
+from typing import Dict, FrozenSet, Iterable, Iterator, Mapping, Tuple
 
 import httpx
+import numpy as np
+import orjson
 
 from .market_data import DEFAULT_QUOTES, MarketQuote
+from .real_time import HTTP2_AVAILABLE
 
 
 logger = logging.getLogger(__name__)
 
+# Fields holding the spot in an EODHD real-time entry, by preference.
+_PRICE_FIELDS = ("close", "adjusted_close", "price", "last", "close_prev")
+
+# Maximum number of symbols per EODHD real-time request.
+_EODHD_BATCH_SIZE = 50
+
+# Reference quote for tickers without a configured fallback.
+_DEFAULT_FALLBACK = MarketQuote(price=Decimal("100"), currency="USD")
+
+
+def _price_units(price: Decimal | float) -> int:
+    """Express ``price`` as an integer number of 1e-4 units."""
+
+    return int((Decimal(str(price)) * 10_000).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+_DEFAULT_FALLBACK_UNITS = (_price_units(_DEFAULT_FALLBACK.price), _DEFAULT_FALLBACK.currency)
+
+
+# The ticker universe is small and polled repeatedly, so the symbol mappings are memoised.
+@functools.lru_cache(maxsize=4096)
+def _to_eodhd_symbol(ticker: str) -> str:
+    normalized = ticker.upper()
+    if "." in normalized:
+        return normalized
+    return f"{normalized}.US"
+
+
+@functools.lru_cache(maxsize=1024)
+def _build_url(symbols: FrozenSet[str]) -> str:
+    # EODHD accepts comma separated symbols for real-time endpoint.
+    return f"https://eodhd.com/api/real-time/{','.join(sorted(symbols))}"
+
+
+@functools.lru_cache(maxsize=4096)
+def _base_ticker(eodhd_symbol: str) -> str:
+    if "." in eodhd_symbol:
+        return eodhd_symbol.split(".", 1)[0]
+    return eodhd_symbol
+
 
 class SpotProvider:
     """Expose consolidated spot prices for a collection of tickers."""
@@ -26,100 +72,177 @@ class SpotProvider:
     ) -> None:
         self._api_token = api_token
         self._client = session
+        # Query string shared by every EODHD request.
+        self._params = {"api_token": api_token, "fmt": "json"}
         # Normalise fallback quotes to uppercase keys for quick lookup.
         base_quotes = fallback_quotes or DEFAULT_QUOTES
         self._fallback_quotes: Dict[str, MarketQuote] = {
             symbol.upper(): quote for symbol, quote in base_quotes.items()
         }
+        # Reference prices in integer 1e-4 units with their currency, for fallback synthesis.
+        self._fallback_units: Dict[str, Tuple[int, str]] = {
+            symbol: (_price_units(quote.price), quote.currency) for symbol, quote in self._fallback_quotes.items()
+        }
+        self._rng = np.random.default_rng()
+        # Tickers requested since the last dispatch; callers in the same loop tick share
+        # one EODHD round-trip (DataLoader-style batching).
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._pending_loop: asyncio.AbstractEventLoop | None = None
+        self._dispatch_tasks: set[asyncio.Task] = set()
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
-            timeout = httpx.Timeout(5.0, connect=5.0)
-            self._client = httpx.AsyncClient(timeout=timeout)
+            # Only eodhd.com is contacted: one keep-alive pool (HTTP/2 when h2 is installed)
+            # keeps the TCP/TLS session for the lifetime of the provider.
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(5.0, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0),
+            )
         return self._client
 
-    @staticmethod
-    def _to_eodhd_symbol(ticker: str) -> str:
-        normalized = ticker.upper()
-        if "." in normalized:
-            return normalized
-        return f"{normalized}.US"
+    _to_eodhd_symbol = staticmethod(_to_eodhd_symbol)
+    _base_ticker = staticmethod(_base_ticker)
 
     @staticmethod
-    def _base_ticker(eodhd_symbol: str) -> str:
-        if "." in eodhd_symbol:
-            return eodhd_symbol.split(".", 1)[0]
-        return eodhd_symbol
+    def _extract_price_float(entry: Mapping[str, object]) -> float | None:
+        """Return the first finite spot found in ``entry`` by field preference."""
 
-    @staticmethod
-    def _extract_price(entry: Mapping[str, object]) -> Decimal | None:
-        for field in ("close", "adjusted_close", "price", "last", "close_prev"):
+        for field in _PRICE_FIELDS:
             value = entry.get(field)
-            if value is None:
+            if value is None or isinstance(value, bool):
                 continue
             try:
-                return Decimal(str(value))
-            except (ValueError, ArithmeticError):
+                price = float(value)
+            except (TypeError, ValueError):
                 continue
+            if math.isfinite(price):
+                return price
         return None
 
     async def _fetch_from_eodhd(self, tickers: Iterable[str]) -> Dict[str, MarketQuote]:
         if not self._api_token:
             return {}
 
-        symbols = {self._to_eodhd_symbol(ticker) for ticker in tickers}
-        if not symbols:
+        # Large baskets are split to stay under EODHD's per-request symbol limit; the chunks
+        # run concurrently over the pooled connection.
+        ordered = sorted({self._to_eodhd_symbol(ticker) for ticker in tickers})
+        if not ordered:
             return {}
+        chunks = [ordered[start:start + _EODHD_BATCH_SIZE] for start in range(0, len(ordered), _EODHD_BATCH_SIZE)]
+        if len(chunks) == 1:
+            fetched = [await self._fetch_chunk(chunks[0])]
+        else:
+            fetched = await asyncio.gather(*(self._fetch_chunk(chunk) for chunk in chunks))
+
+        quotes: Dict[str, MarketQuote] = {}
+        for chunk_quotes in fetched:
+            quotes.update(chunk_quotes)
+        return quotes
 
+    async def _fetch_chunk(self, symbols: list[str]) -> Dict[str, MarketQuote]:
         client = await self._get_client()
-        # EODHD accepts comma separated symbols for real-time endpoint.
-        symbol_path = ",".join(sorted(symbols))
-        url = f"https://eodhd.com/api/real-time/{symbol_path}"
-        params = {"api_token": self._api_token, "fmt": "json"}
+        url = _build_url(frozenset(symbols))
 
         try:
-            response = await client.get(url, params=params)
+            response = await client.get(url, params=self._params)
             response.raise_for_status()
-            payload = response.json()
+            payload = orjson.loads(response.content)
         except Exception as exc:  # pragma: no cover - network errors not triggered in tests
             logger.warning("Unable to retrieve quotes from EODHD: %s", exc)
             return {}
 
-        entries: Iterable[Mapping[str, object]]
-        if isinstance(payload, list):
-            entries = payload
-        elif isinstance(payload, dict):
-            entries = [payload]
-        else:
+        if isinstance(payload, dict):
+            payload = [payload]
+        elif not isinstance(payload, list):
             logger.debug("Unexpected payload type from EODHD: %r", type(payload))
             return {}
 
         quotes: Dict[str, MarketQuote] = {}
-        for entry in entries:
-            code = entry.get("code") or entry.get("symbol") or entry.get("ticker")
-            if not isinstance(code, str):
-                continue
-            ticker = self._base_ticker(code)
-            price = self._extract_price(entry)
-            if price is None:
+        # Entries are consumed from the end so each decoded dict is released as soon as it is
+        # projected; the first projection kept per ticker is the payload's last one.
+        while payload:
+            item = self._project_entry(payload.pop())
+            if item is None or item[0] in quotes:
                 continue
-            currency = entry.get("currency") if isinstance(entry.get("currency"), str) else "USD"
-            quotes[ticker] = MarketQuote(price=price, currency=currency.upper())
+            ticker, quote = item
+            quotes[ticker] = quote
         return quotes
 
+    @classmethod
+    def _project_entry(cls, entry: Mapping[str, object]) -> Tuple[str, MarketQuote] | None:
+        """Keep only the ticker, spot and currency of an EODHD real-time entry."""
+
+        code = entry.get("code") or entry.get("symbol") or entry.get("ticker")
+        if not isinstance(code, str):
+            return None
+        price = cls._extract_price_float(entry)
+        if price is None:
+            return None
+        currency = entry.get("currency")
+        currency = currency.upper() if isinstance(currency, str) else "USD"
+        return cls._base_ticker(code), MarketQuote(price=price, currency=currency)
+
     async def get_quotes(self, tickers: Iterable[str]) -> Dict[str, MarketQuote]:
-        normalized = {ticker.upper() for ticker in tickers}
+        # Normalised once into an ordered, de-duplicated list: ``tickers`` may be a one-shot
+        # iterator and is not read again.
+        normalized = list(dict.fromkeys(ticker.upper() for ticker in tickers))
         if not normalized:
             return {}
 
-        quotes: Dict[str, MarketQuote] = {}
+        loop = asyncio.get_running_loop()
+        if self._pending and self._pending_loop is not loop:
+            # Futures left over from another (closed) loop cannot be awaited here.
+            self._pending = {}
+        if not self._pending:
+            # First caller of a batch schedules its dispatch for the next loop iteration.
+            self._pending_loop = loop
+            task = loop.create_task(self._dispatch(self._pending))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+
+        batch = self._pending
+        futures: Dict[str, asyncio.Future] = dict.fromkeys(normalized)
+        for ticker in normalized:
+            future = batch.get(ticker)
+            if future is None:
+                future = batch[ticker] = loop.create_future()
+            futures[ticker] = future
+        # Shielded: the futures are shared with the other callers of this batch, so cancelling
+        # one caller must not cancel them.
+        return {ticker: await asyncio.shield(future) for ticker, future in futures.items()}
+
+    async def _dispatch(self, batch: Dict[str, asyncio.Future]) -> None:
+        # Let every caller scheduled in this loop iteration register its tickers first.
+        await asyncio.sleep(0)
+        if self._pending is batch:
+            self._pending = {}
+        try:
+            quotes = await self._load_quotes(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for ticker, future in batch.items():
+            if not future.done():
+                future.set_result(quotes[ticker])
+
+    async def _load_quotes(self, normalized: list[str]) -> Dict[str, MarketQuote]:
         eodhd_quotes = await self._fetch_from_eodhd(normalized)
+        # Keyed up front so the result is sized once; every key is filled below.
+        quotes: Dict[str, MarketQuote] = dict.fromkeys(normalized)
         quotes.update(eodhd_quotes)
 
-        missing = normalized - set(quotes.keys())
+        missing = [ticker for ticker in normalized if ticker not in eodhd_quotes]
         if missing:
             logger.info("Missing quotes for tickers: %s, synthesising fallback prices", missing)
-            quotes.update(self._build_fallback_quotes(missing))
+            for ticker, quote in self._build_fallback_quotes(missing):
+                quotes[ticker] = quote
 
         return quotes
 
@@ -128,17 +251,58 @@ class SpotProvider:
             await self._client.aclose()
             self._client = None
 
-    def _build_fallback_quotes(self, tickers: Iterable[str]) -> Dict[str, MarketQuote]:
-        fallback: Dict[str, MarketQuote] = {}
-        for ticker in tickers:
-            fallback_quote = self._fallback_quotes.get(ticker)
-            if fallback_quote is None:
-                fallback_quote = MarketQuote(price=Decimal("100"), currency="USD")
-            randomized = self._randomize_quote(fallback_quote)
-            fallback[ticker] = randomized
-        return fallback
-
-    def _randomize_quote(self, base_quote: MarketQuote) -> MarketQuote:
-        factor = Decimal("0.5") + Decimal("0.1") * Decimal(str(random.random()))
-        randomized_price = (base_quote.price * factor).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
-        return MarketQuote(price=randomized_price, currency=base_quote.currency)
+    def _build_fallback_quotes(self, tickers: Iterable[str]) -> Iterator[Tuple[str, MarketQuote]]:
+        tickers = list(tickers)
+        # Tickers are already upper-cased by get_quotes.
+        references = [self._fallback_units.get(ticker, _DEFAULT_FALLBACK_UNITS) for ticker in tickers]
+        # Synthetic prices: 50%-60% of the reference price, drawn in 1e-4 steps and computed in
+        # integer price units; the Decimal is only built for the final quote.
+        units = np.fromiter((reference[0] for reference in references), dtype=np.int64, count=len(tickers))
+        randomized = units * self._rng.integers(5_000, 6_001, size=len(tickers)) // 10_000
+        for ticker, reference, price_units in zip(tickers, references, randomized.tolist()):
+            yield ticker, MarketQuote(price=Decimal(price_units).scaleb(-4), currency=reference[1], synthetic=True)
+
+
+class QuoteCache:
+    """Short-lived per-ticker cache in front of :class:`SpotProvider`.
+
+    Callers ticking within ``ttl`` seconds of each other share one upstream fetch, and
+    only the stale tickers of a request are fetched again. This is the only per-ticker
+    cache in front of EODHD; keep ``ttl`` below the caller's poll interval so every poll
+    sees fresh spots.
+    """
+
+    def __init__(self, spot_provider: SpotProvider, ttl: float = 0.5) -> None:
+        self._spot_provider = spot_provider
+        self._ttl = ttl
+        self._entries: Dict[str, Tuple[float, MarketQuote]] = {}
+
+    def peek(self, ticker: str) -> MarketQuote | None:
+        """Return the cached live quote for ``ticker`` if it is still fresh, without fetching.
+
+        Synthetic fallback quotes are never returned.
+        """
+
+        entry = self._entries.get(ticker.upper())
+        if entry is None or entry[1].synthetic or time.monotonic() - entry[0] > self._ttl:
+            return None
+        return entry[1]
+
+    async def get_quotes(self, tickers: Iterable[str]) -> Dict[str, MarketQuote]:
+        now = time.monotonic()
+        quotes: Dict[str, MarketQuote] = {}
+        stale: list[str] = []
+        for ticker in dict.fromkeys(ticker.upper() for ticker in tickers):
+            entry = self._entries.get(ticker)
+            if entry is not None and now - entry[0] <= self._ttl:
+                quotes[ticker] = entry[1]
+            else:
+                stale.append(ticker)
+
+        if stale:
+            fetched = await self._spot_provider.get_quotes(stale)
+            fetched_at = time.monotonic()
+            for ticker, quote in fetched.items():
+                self._entries[ticker] = (fetched_at, quote)
+            quotes.update(fetched)
+        return quotes
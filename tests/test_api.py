@@ -1,12 +1,19 @@
+import asyncio
 import json
 import os
 import time
+from decimal import Decimal
 from typing import Optional
 
 from fastapi.testclient import TestClient
 import pytest
 
-from app.main import create_app
+from app.main import create_app, prices_event, refresh_baskets, snapshot_event, stream_basket_events
+from app.models import BasketRequest, BasketStreamPayload
+from app.services.basket_cache import BasketCache
+from app.services.broadcaster import PriceBroadcaster
+from app.services.market_data import MarketDataProvider, MarketQuote
+from app.services.pricing import FxRateProvider, PricingService
 
 
 os.environ.setdefault("BASKET_STREAM_INTERVAL", "0.1")
@@ -121,6 +128,134 @@ def test_metrics_endpoint() -> None:
     assert "basket_pricing_requests_total" in body
 
 
+def test_prices_event_payload_matches_stream_model() -> None:
+    pricing_service = PricingService(MarketDataProvider(), FxRateProvider())
+    cache = BasketCache()
+    request = BasketRequest.model_validate(
+        {"basket_name": "Solo", "positions": [{"ticker": "AAPL", "weight": "1"}]}
+    )
+    cache.upsert("solo", request, pricing_service.price_basket(request))
+
+    frame = prices_event(cache.list())
+
+    event_line, data_line = frame.decode().rstrip("\n").split("\n")
+    payload = BasketStreamPayload.model_validate_json(data_line.removeprefix("data: "))
+    assert event_line == "event: prices"
+    assert [item.basket_id for item in payload.baskets] == ["solo"]
+    assert payload.baskets[0].basket_price == cache.get("solo").pricing.basket_price
+
+
+def test_refresh_baskets_matches_full_repricing() -> None:
+    pricing_service = PricingService(MarketDataProvider(), FxRateProvider())
+    cache = BasketCache()
+    request = BasketRequest.model_validate(
+        {
+            "basket_name": "Delta",
+            "positions": [
+                {"ticker": "AAPL", "weight": "0.6"},
+                {"ticker": "SAP", "weight": "0.4"},
+            ],
+            "notional": "1000000",
+        }
+    )
+    cache.upsert("delta", request, pricing_service.price_basket(request))
+    quotes = {
+        "AAPL": MarketQuote(price=Decimal("195.10"), currency="USD"),
+        "SAP": MarketQuote(price=Decimal("125"), currency="EUR"),
+    }
+
+    (refreshed,) = refresh_baskets(cache.list(), quotes, cache, pricing_service)
+
+    expected = pricing_service.price_basket(request, market_overrides=quotes)
+    assert refreshed.pricing.basket_price == expected.basket_price
+    assert refreshed.pricing.positions == expected.positions
+
+
+def test_currency_change_keeps_live_spots_of_unmoved_positions() -> None:
+    pricing_service = PricingService(MarketDataProvider(), FxRateProvider())
+    cache = BasketCache()
+    request = BasketRequest.model_validate(
+        {
+            "basket_name": "Switch",
+            "positions": [
+                {"ticker": "AAPL", "weight": "0.5"},
+                {"ticker": "MSFT", "weight": "0.5"},
+            ],
+        }
+    )
+    cache.upsert("switch", request, pricing_service.price_basket(request))
+    refresh_baskets(
+        cache.list(), {"MSFT": MarketQuote(price=Decimal("300.00"), currency="USD")}, cache, pricing_service
+    )
+
+    # Only the moved ticker is passed, as on a tick where the basket revision is unchanged.
+    (refreshed,) = refresh_baskets(
+        cache.list(), {"AAPL": MarketQuote(price=Decimal("180"), currency="EUR")}, cache, pricing_service
+    )
+
+    prices = {position.ticker: position for position in refreshed.pricing.positions}
+    assert prices["AAPL"].price_currency == "EUR"
+    assert prices["MSFT"].price == Decimal("300")
+
+
+def test_stream_sends_heartbeat_when_quotes_are_unchanged() -> None:
+    pricing_service = PricingService(MarketDataProvider(), FxRateProvider())
+    cache = BasketCache()
+    request = BasketRequest.model_validate(
+        {"basket_name": "Quiet", "positions": [{"ticker": "AAPL", "weight": "1"}]}
+    )
+    cache.upsert("quiet", request, pricing_service.price_basket(request))
+
+    class _StaticSpots:
+        async def get_quotes(self, tickers):
+            return {"AAPL": MarketQuote(price=Decimal("190"), currency="USD")}
+
+    async def _collect() -> list[bytes]:
+        events = stream_basket_events(cache, _StaticSpots(), pricing_service, stream_interval=0.01)
+        frames = [await events.__anext__() for _ in range(2)]
+        await events.aclose()
+        return frames
+
+    first, second = asyncio.run(_collect())
+
+    assert first.startswith(b"event: prices")
+    assert second.startswith(b"event: heartbeat")
+    assert cache.get("quiet").pricing.basket_price == Decimal("190")
+
+
+def test_late_subscriber_gets_current_prices_while_quotes_are_flat() -> None:
+    pricing_service = PricingService(MarketDataProvider(), FxRateProvider())
+    cache = BasketCache()
+    request = BasketRequest.model_validate(
+        {"basket_name": "Flat", "positions": [{"ticker": "AAPL", "weight": "1"}]}
+    )
+    cache.upsert("flat", request, pricing_service.price_basket(request))
+
+    class _StaticSpots:
+        async def get_quotes(self, tickers):
+            return {"AAPL": MarketQuote(price=Decimal("190"), currency="USD")}
+
+    broadcaster = PriceBroadcaster(
+        lambda: stream_basket_events(cache, _StaticSpots(), pricing_service, stream_interval=0.01),
+        snapshot=lambda: snapshot_event(cache),
+    )
+
+    async def _collect() -> bytes:
+        early = broadcaster.subscribe()
+        # Let the producer publish its first full frame and settle into heartbeats.
+        for _ in range(3):
+            await asyncio.wait_for(early.get(), timeout=1)
+        late = broadcaster.subscribe()
+        first_late = await asyncio.wait_for(late.get(), timeout=1)
+        await broadcaster.aclose()
+        return first_late
+
+    first_late = asyncio.run(_collect())
+
+    assert first_late.startswith(b"event: prices")
+    assert b'"basket_id":"flat"' in first_late
+
+
 @pytest.mark.skip(reason="Flaky in CI, needs investigation")
 def test_basket_stream_emits_price_updates() -> None:
     basket = _create_sample_basket("Realtime")
@@ -0,0 +1,67 @@
+from app.models import BasketRequest
+from app.services.basket_cache import BasketCache
+from app.services.market_data import MarketDataProvider
+from app.services.pricing import FxRateProvider, PricingService
+
+
+_pricing_service = PricingService(MarketDataProvider(), FxRateProvider())
+
+
+def _store(cache: BasketCache, basket_id: str, *tickers: str) -> None:
+    request = BasketRequest.model_validate(
+        {
+            "basket_name": basket_id,
+            "positions": [{"ticker": ticker, "weight": "1"} for ticker in tickers],
+        }
+    )
+    cache.upsert(basket_id, request, _pricing_service.price_basket(request))
+
+
+def test_all_tickers_tracks_upserts_and_removals() -> None:
+    cache = BasketCache()
+    _store(cache, "one", "aapl", "MSFT")
+    _store(cache, "two", "AAPL", "GOOGL")
+
+    assert cache.all_tickers() == {"AAPL", "MSFT", "GOOGL"}
+
+    _store(cache, "one", "NVDA")
+    assert cache.all_tickers() == {"AAPL", "GOOGL", "NVDA"}
+
+    cache.remove("two")
+    assert cache.all_tickers() == {"NVDA"}
+
+
+def test_list_and_ids_cover_every_shard() -> None:
+    cache = BasketCache(shard_count=4)
+    for index in range(10):
+        _store(cache, f"basket-{index}", "AAPL")
+
+    assert sorted(cache.ids()) == sorted(f"basket-{index}" for index in range(10))
+    assert len(cache.list()) == 10
+    assert cache.get("basket-7").basket_id == "basket-7"
+
+
+def test_list_and_ids_keep_insertion_order_across_updates() -> None:
+    cache = BasketCache(shard_count=4)
+    for index in range(6):
+        _store(cache, f"b{index}", "AAPL")
+    _store(cache, "b2", "MSFT")
+    cache.remove("b4")
+    _store(cache, "b4", "AAPL")
+
+    expected = ["b0", "b1", "b2", "b3", "b5", "b4"]
+    assert list(cache.ids()) == expected
+    assert [item.basket_id for item in cache.list()] == expected
+
+
+def test_baskets_for_returns_only_baskets_holding_the_tickers() -> None:
+    cache = BasketCache()
+    _store(cache, "one", "AAPL", "MSFT")
+    _store(cache, "two", "AAPL")
+    _store(cache, "three", "GOOGL")
+
+    assert sorted(basket.basket_id for basket in cache.baskets_for(["AAPL"])) == ["one", "two"]
+    assert [basket.basket_id for basket in cache.baskets_for({"MSFT", "NVDA"})] == ["one"]
+
+    cache.remove("one")
+    assert [basket.basket_id for basket in cache.baskets_for(["AAPL", "MSFT"])] == ["two"]
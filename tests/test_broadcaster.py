@@ -0,0 +1,105 @@
+import asyncio
+
+from app.services.broadcaster import PriceBroadcaster
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_single_producer_feeds_every_subscriber() -> None:
+    started: list[int] = []
+
+    async def _producer():
+        started.append(1)
+        for tick in range(3):
+            yield tick
+            await asyncio.sleep(0)
+        await asyncio.Event().wait()
+
+    broadcaster = PriceBroadcaster(_producer)
+
+    async def _collect() -> tuple[list[int], list[int]]:
+        first = broadcaster.subscribe()
+        second = broadcaster.subscribe()
+        received_first = [await first.get() for _ in range(3)]
+        received_second = [await second.get() for _ in range(3)]
+        broadcaster.unsubscribe(first)
+        broadcaster.unsubscribe(second)
+        return received_first, received_second
+
+    received_first, received_second = _run(_collect())
+
+    assert received_first == [0, 1, 2]
+    assert received_second == [0, 1, 2]
+    assert started == [1]
+    assert broadcaster.subscriber_count == 0
+
+
+def test_slow_subscriber_drops_oldest_events() -> None:
+    async def _producer():
+        for tick in range(5):
+            yield tick
+        await asyncio.Event().wait()
+
+    broadcaster = PriceBroadcaster(_producer, max_pending=2)
+
+    async def _collect() -> list[int]:
+        queue = broadcaster.subscribe()
+        await asyncio.sleep(0.01)
+        received = [queue.get_nowait() for _ in range(queue.qsize())]
+        await broadcaster.aclose()
+        return received
+
+    assert _run(_collect()) == [3, 4]
+
+
+def test_producer_failure_ends_every_stream() -> None:
+    runs: list[int] = []
+
+    async def _producer():
+        runs.append(1)
+        yield "tick"
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    broadcaster = PriceBroadcaster(_producer)
+
+    async def _consume() -> list[object]:
+        return [event async for event in broadcaster.events()]
+
+    async def _collect() -> tuple[list[object], list[object], list[object]]:
+        first, second = await asyncio.wait_for(asyncio.gather(_consume(), _consume()), timeout=1)
+        third = await asyncio.wait_for(_consume(), timeout=1)
+        return first, second, third
+
+    first, second, third = _run(_collect())
+
+    assert first == ["tick"]
+    assert second == ["tick"]
+    assert third == ["tick"]
+    assert runs == [1, 1]
+    assert broadcaster.subscriber_count == 0
+
+
+def test_aclose_ends_open_streams() -> None:
+    async def _producer():
+        yield "tick"
+        await asyncio.Event().wait()
+
+    broadcaster = PriceBroadcaster(_producer)
+
+    async def _collect() -> list[object]:
+        received: list[object] = []
+
+        async def _consume() -> None:
+            async for event in broadcaster.events():
+                received.append(event)
+
+        consumer = asyncio.create_task(_consume())
+        await asyncio.sleep(0.01)
+        await broadcaster.aclose()
+        await asyncio.wait_for(consumer, timeout=1)
+        return received
+
+    assert _run(_collect()) == ["tick"]
@@ -1,19 +1,27 @@
 # Example usage of CustomBasketPricer
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 import pytest
 from app.services.custom_basket_pricer import BasketFees, BasketParameters, CustomBasketPricer
 
-def _create_pricer() -> CustomBasketPricer:
-    # Simulated daily prices for 3 symbols over 3 months
-
+@lru_cache(maxsize=None)
+def _simulated_prices() -> pd.DataFrame:
+    # Simulated daily prices for 3 symbols over 3 months (seeded, built once per session;
+    # the pricer never writes to its price frame)
+    rng = np.random.default_rng(0)
     dates = pd.bdate_range("2025-01-01", "2025-03-31")
-    prices = pd.DataFrame({
-        "AAPL": 180 + np.cumsum(np.random.normal(0, 0.5, len(dates))),
-        "MSFT": 400 + np.cumsum(np.random.normal(0, 0.6, len(dates))),
-        "TSLA": 250 + np.cumsum(np.random.normal(0, 1.2, len(dates))),
+    return pd.DataFrame({
+        "AAPL": 180 + np.cumsum(rng.normal(0, 0.5, len(dates))),
+        "MSFT": 400 + np.cumsum(rng.normal(0, 0.6, len(dates))),
+        "TSLA": 250 + np.cumsum(rng.normal(0, 1.2, len(dates))),
     }, index=dates)
 
+def _create_pricer() -> CustomBasketPricer:
+    prices = _simulated_prices()
+    dates = prices.index
+
     weights0 = {"AAPL": 0.4, "MSFT": 0.4, "TSLA": 0.2}
 
     # Taux quotidien ~ 5%/an -> 0.05/252
@@ -35,6 +43,91 @@ def _create_pricer() -> CustomBasketPricer:
     pricer = CustomBasketPricer(prices, weights0, funding_rate=funding, params=params, fees=fees)
     return pricer
 
+def _create_regression_pricer(initial_nav: float = 100.0) -> CustomBasketPricer:
+    # Hand-written prices: MSFT is missing on the second day and TSLA is held short.
+    dates = pd.bdate_range("2025-01-06", periods=6)
+    prices = pd.DataFrame({
+        "AAPL": [100.0, 101.0, 99.5, 102.0, 103.0, 101.5],
+        "MSFT": [200.0, np.nan, 204.0, 202.0, 206.0, 207.0],
+        "TSLA": [50.0, 52.0, 51.0, 49.0, 48.5, 50.5],
+    }, index=dates)
+    funding = pd.Series([0.0002, 0.0002, 0.00021, 0.00021, 0.00022, 0.00022], index=dates)
+    params = BasketParameters(
+        initial_nav=initial_nav,
+        dividend_yield_ann={"AAPL": 0.02, "MSFT": 0.01, "TSLA": 0.03},
+        withholding_by_symbol={"AAPL": 0.3},
+    )
+    fees = BasketFees(
+        structuring_fee_bps=5.0,
+        exec_cost_bps=10.0,
+        default_withholding=0.15,
+        borrow_fee_bps={"TSLA": 200.0},
+    )
+    weights0 = {"AAPL": 0.5, "MSFT": 0.7, "TSLA": -0.2}
+    return CustomBasketPricer(prices, weights0, funding_rate=funding, params=params, fees=fees)
+
+# Reference values produced by the original pandas implementation of run()/rebalance().
+EXPECTED_NAV = [100.0, 99.2331150794, 98.4032942336, 99.2830778292, 100.8714133582, 99.2368558848]
+EXPECTED_PNL = [
+    [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    [-0.3, 0.0031150794, -0.02, -0.4, -0.05, 0.0],
+    [-0.3483609857, 0.0030475662, -0.0208389542, -0.4140519145, -0.0496165575, 0.0],
+    [1.3507305553, 0.0030315488, -0.0206646918, -0.4041121696, -0.0492016471, 0.0],
+    [2.0431082717, 0.0031426777, -0.0218422771, -0.3864316042, -0.0496415389, 0.0],
+    [-1.1843794457, 0.0032211279, -0.0221917109, -0.380771738, -0.0504357067, 0.0],
+]
+EXPECTED_WEIGHTS = [
+    [0.5, 0.7, -0.2],
+    [0.5065195587, 0.702106319, -0.2086258776],
+    [0.5007549069, 0.7045797685, -0.2053346754],
+    [0.5063857955, 0.6882252161, -0.1946110116],
+    [0.5010396597, 0.6877014937, -0.1887411534],
+    [0.4996091149, 0.6992500796, -0.1988591945],
+]
+
+def test_run_matches_reference_values() -> None:
+    pricer = _create_regression_pricer()
+    pricer.run()
+    res = pricer.results()
+
+    assert res["nav"].tolist() == pytest.approx(EXPECTED_NAV, abs=1e-9)
+    assert list(res["pnl_breakdown"].columns) == [
+        "Price", "Dividend", "Funding", "Borrow", "Structuring", "RebalanceCost"
+    ]
+    assert res["pnl_breakdown"].to_numpy().tolist() == [pytest.approx(row, abs=1e-9) for row in EXPECTED_PNL]
+    assert res["weights"].to_numpy().tolist() == [pytest.approx(row, abs=1e-9) for row in EXPECTED_WEIGHTS]
+
+def test_rebalance_after_run_charges_execution_cost() -> None:
+    pricer = _create_regression_pricer()
+    pricer.run()
+    rebal_date = pricer.prices.index[3]
+    pricer.rebalance(rebal_date, {"AAPL": 0.6, "MSFT": 0.6, "TSLA": -0.2})
+    res = pricer.results()
+
+    expected_nav = list(EXPECTED_NAV)
+    expected_nav[3] = 99.2727868354
+    assert res["nav"].tolist() == pytest.approx(expected_nav, abs=1e-9)
+    assert res["pnl_breakdown"]["RebalanceCost"].tolist() == pytest.approx(
+        [0.0, 0.0, 0.0, -0.0102909937, 0.0, 0.0], abs=1e-9
+    )
+    assert res["weights"].loc[rebal_date].tolist() == pytest.approx([0.6, 0.6, -0.2])
+    # Other dates keep the drifted weights of the initial run.
+    assert res["weights"].drop(index=rebal_date).to_numpy().tolist() == [
+        pytest.approx(row, abs=1e-9) for index, row in enumerate(EXPECTED_WEIGHTS) if index != 3
+    ]
+
+def test_dividends_follow_the_weight_sign_when_nav_is_negative() -> None:
+    pricer = _create_regression_pricer(initial_nav=-100.0)
+    pricer.run()
+    res = pricer.results()
+
+    assert res["nav"].tolist() == pytest.approx(
+        [-100.0, -99.2268849206, -98.3910214239, -99.264632952, -100.8463892113, -99.2057965809], abs=1e-9
+    )
+    assert res["pnl_breakdown"]["Dividend"].tolist() == pytest.approx(
+        [0.0, 0.0031150794, 0.0030473748, 0.0030311707, 0.0031420938, 0.0032203288], abs=1e-9
+    )
+
 @pytest.mark.skip(reason="Example usage, not a real test")
 def test_pricer() -> None:
     pricer = _create_pricer()
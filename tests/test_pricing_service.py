@@ -1,9 +1,10 @@
 from decimal import Decimal
 
 import pytest
+from prometheus_client import REGISTRY
 
 from app.models import BasketPositionRequest, BasketRequest
-from app.services.market_data import MarketDataProvider
+from app.services.market_data import MarketDataProvider, MarketQuote
 from app.services.pricing import FxRateProvider, PricingService
 
 
@@ -58,6 +59,27 @@ def test_price_with_market_data_and_fx_overrides() -> None:
     # assert sap.price_in_base == Decimal("137.5000")
 
 
+def test_position_price_echoes_the_source_spot() -> None:
+    service = _create_service()
+    request = BasketRequest(
+        basket_name="Penny",
+        positions=[
+            BasketPositionRequest(ticker="AAPL", weight=Decimal("0.5")),
+            BasketPositionRequest(ticker="MSFT", weight=Decimal("0.5")),
+        ],
+    )
+
+    result = service.price_basket(
+        request, market_overrides={"AAPL": MarketQuote(price=Decimal("0.000123"), currency="USD")}
+    )
+
+    aapl, msft = result.positions
+    assert aapl.price == Decimal("0.000123")
+    assert msft.price == Decimal("338.11")
+    # Derived fields keep their 4-decimal rounding.
+    assert aapl.contribution == Decimal("0.0001")
+
+
 def test_weights_normalization_message() -> None:
     service = _create_service()
 
@@ -89,3 +111,51 @@ def test_raises_when_missing_market_data() -> None:
 
     with pytest.raises(KeyError):
         service.price_basket(request)
+
+
+def test_rates_to_resolves_inverses_and_overrides() -> None:
+    provider = FxRateProvider({("USD", "CHF"): Decimal("0.8")})
+
+    rates = provider.rates_to("usd")
+
+    assert rates["USD"] == Decimal("1")
+    assert rates["EUR"] == Decimal("1.087")
+    assert rates["CHF"] == Decimal("1") / Decimal("0.8")
+    assert provider.rates_to("USD", {("CHF", "USD"): Decimal("1.3")})["CHF"] == Decimal("1.3")
+    assert provider.rates_to("USD")["CHF"] == Decimal("1.25")
+
+
+def test_identical_requests_reuse_the_cached_response() -> None:
+    service = _create_service()
+    request = BasketRequest(
+        basket_name="Cached",
+        positions=[BasketPositionRequest(ticker="AAPL", weight=Decimal("1"))],
+    )
+
+    first = service.price_basket(request)
+
+    assert service.price_basket(request.model_copy()) is first
+    assert service.price_basket(request, fx_overrides={("EUR", "USD"): Decimal("1.1")}) is not first
+
+    uncached = PricingService(MarketDataProvider(), FxRateProvider(), response_ttl=0)
+    assert uncached.price_basket(request) is not uncached.price_basket(request)
+
+
+def test_cache_hits_are_counted_as_pricing_requests() -> None:
+    service = _create_service()
+    request = BasketRequest(
+        basket_name="Counted",
+        positions=[BasketPositionRequest(ticker="MSFT", weight=Decimal("1"))],
+    )
+    service.price_basket(request)
+
+    def _sample(name: str, labels: dict[str, str] | None = None) -> float:
+        return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+    requests_before = _sample("basket_pricing_requests_total", {"status": "success"})
+    observations_before = _sample("basket_pricing_duration_seconds_count")
+
+    service.price_basket(request)
+
+    assert _sample("basket_pricing_requests_total", {"status": "success"}) == requests_before + 1
+    assert _sample("basket_pricing_duration_seconds_count") == observations_before + 1
@@ -1,8 +1,10 @@
 import asyncio
 from typing import Any, Dict, Iterable, List, Mapping
 
+import orjson
 import pytest
 
+from app.services import real_time
 from app.services.real_time import EODHDDelayedClient
 
 
@@ -15,6 +17,10 @@ class _DummyResponse:
         if self.status_code >= 400:
             raise RuntimeError("http error")
 
+    @property
+    def content(self) -> bytes:
+        return orjson.dumps(self._payload)
+
     def json(self) -> Any:
         return self._payload
 
@@ -105,3 +111,65 @@ def test_stream_quotes_yields_requested_number(monkeypatch: pytest.MonkeyPatch)
     assert len(updates) == 3
     assert all("AAPL" in payload for payload in updates)
 
+
+
+def test_fetch_quotes_coalesces_concurrent_requests_and_reuses_fresh_entries() -> None:
+    class _SlowClient(_DummyClient):
+        async def get(self, url: str, *, params: Mapping[str, str]) -> _DummyResponse:  # type: ignore[override]
+            self.calls.append((url, dict(params)))
+            await asyncio.sleep(0.01)
+            return _DummyResponse([{"code": "AAPL.US", "price": 101.5}])
+
+    client = _SlowClient([])
+    service = EODHDDelayedClient(api_token="token", session=client)
+
+    async def _collect() -> list[Dict[str, Any]]:
+        first, second = await asyncio.gather(service.fetch_quotes(["aapl"]), service.fetch_quotes(["AAPL"]))
+        cached = await service.fetch_quotes(["aapl"], max_age=60.0)
+        return [first, second, cached]
+
+    results = _run(_collect())
+
+    assert len(client.calls) == 1
+    assert all(result == {"AAPL": {"code": "AAPL.US", "price": 101.5}} for result in results)
+
+
+def test_cancelling_the_first_caller_does_not_cancel_coalesced_callers() -> None:
+    class _SlowClient(_DummyClient):
+        async def get(self, url: str, *, params: Mapping[str, str]) -> _DummyResponse:  # type: ignore[override]
+            self.calls.append((url, dict(params)))
+            await asyncio.sleep(0.01)
+            return _DummyResponse([{"code": "AAPL.US", "price": 101.5}])
+
+    client = _SlowClient([])
+    service = EODHDDelayedClient(api_token="token", session=client)
+
+    async def _collect() -> tuple[bool, Dict[str, Any]]:
+        leader = asyncio.create_task(service.fetch_quotes(["aapl"]))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(service.fetch_quotes(["AAPL"]))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.gather(leader, return_exceptions=True)
+        return leader.cancelled(), await follower
+
+    leader_cancelled, follower_result = _run(_collect())
+
+    assert leader_cancelled
+    assert follower_result == {"AAPL": {"code": "AAPL.US", "price": 101.5}}
+    assert len(client.calls) == 1
+
+
+def test_shared_client_from_a_previous_loop_is_closed_when_replaced() -> None:
+    async def _shared() -> Any:
+        return await real_time._get_shared_client()
+
+    try:
+        first = _run(_shared())
+        second = _run(_shared())
+
+        assert second is not first
+        assert first.is_closed
+        assert not second.is_closed
+    finally:
+        _run(real_time.aclose_shared_client())
@@ -0,0 +1,145 @@
+import asyncio
+from decimal import Decimal
+from typing import Iterable
+
+from app.services.market_data import MarketQuote
+from app.services.spot_providers import QuoteCache, SpotProvider
+
+
+class _DummyResponse:
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+class _DummySession:
+    """Stands in for the httpx client; every request gets the same raw EODHD payload."""
+
+    def __init__(self, content: bytes) -> None:
+        self._content = content
+        self.urls: list[str] = []
+
+    async def get(self, url: str, *, params: dict) -> _DummyResponse:
+        self.urls.append(url)
+        return _DummyResponse(self._content)
+
+    async def aclose(self) -> None:  # pragma: no cover - not exercised in tests
+        pass
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class _CountingProvider:
+    def __init__(self) -> None:
+        self.requests: list[set[str]] = []
+
+    async def get_quotes(self, tickers: Iterable[str]) -> dict[str, MarketQuote]:
+        requested = set(tickers)
+        self.requests.append(requested)
+        return {ticker: MarketQuote(price=Decimal("10"), currency="USD") for ticker in requested}
+
+
+def test_quote_cache_only_fetches_stale_tickers() -> None:
+    provider = _CountingProvider()
+    cache = QuoteCache(provider, ttl=60)
+
+    async def _fetch() -> tuple[dict, dict]:
+        first = await cache.get_quotes(["aapl"])
+        second = await cache.get_quotes(["AAPL", "msft"])
+        return first, second
+
+    first, second = _run(_fetch())
+
+    assert set(first) == {"AAPL"}
+    assert set(second) == {"AAPL", "MSFT"}
+    assert provider.requests == [{"AAPL"}, {"MSFT"}]
+    assert cache.peek("msft") == MarketQuote(price=Decimal("10"), currency="USD")
+
+
+def test_quote_cache_expires_entries() -> None:
+    provider = _CountingProvider()
+    cache = QuoteCache(provider, ttl=0)
+
+    async def _fetch() -> None:
+        await cache.get_quotes(["AAPL"])
+        await asyncio.sleep(0.01)
+        await cache.get_quotes(["AAPL"])
+
+    _run(_fetch())
+
+    assert provider.requests == [{"AAPL"}, {"AAPL"}]
+    assert cache.peek("AAPL") is None
+
+
+def test_spot_provider_coalesces_concurrent_callers_into_one_request() -> None:
+    session = _DummySession(b'[{"code": "AAPL.US", "close": 190.5}, {"code": "MSFT.US", "close": 330.25}]')
+    provider = SpotProvider(api_token="token", session=session)
+
+    async def _fetch() -> list[dict[str, MarketQuote]]:
+        return await asyncio.gather(provider.get_quotes(["aapl"]), provider.get_quotes(["AAPL", "MSFT"]))
+
+    first, second = _run(_fetch())
+
+    assert session.urls == ["https://eodhd.com/api/real-time/AAPL.US,MSFT.US"]
+    assert first == {"AAPL": MarketQuote(price=Decimal("190.5"), currency="USD")}
+    assert second["MSFT"] == MarketQuote(price=Decimal("330.25"), currency="USD")
+
+
+def test_cancelling_one_caller_does_not_cancel_the_rest_of_the_batch() -> None:
+    class _SlowSession(_DummySession):
+        async def get(self, url: str, *, params: dict) -> _DummyResponse:
+            await asyncio.sleep(0.01)
+            return await super().get(url, params=params)
+
+    session = _SlowSession(b'{"code": "AAPL.US", "close": 190.5}')
+    provider = SpotProvider(api_token="token", session=session)
+
+    async def _fetch() -> tuple[bool, dict[str, MarketQuote]]:
+        first = asyncio.create_task(provider.get_quotes(["AAPL"]))
+        second = asyncio.create_task(provider.get_quotes(["AAPL"]))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        return first.cancelled(), await second
+
+    first_cancelled, second = _run(_fetch())
+
+    assert first_cancelled
+    assert second == {"AAPL": MarketQuote(price=Decimal("190.5"), currency="USD")}
+    assert len(session.urls) == 1
+
+
+def test_quote_cache_reuses_fresh_upstream_quotes() -> None:
+    session = _DummySession(b'{"code": "AAPL.US", "close": 190.5}')
+    cache = QuoteCache(SpotProvider(api_token="token", session=session), ttl=60)
+
+    async def _fetch() -> dict[str, MarketQuote]:
+        await cache.get_quotes(["AAPL"])
+        return await cache.get_quotes(["aapl"])
+
+    assert _run(_fetch()) == {"AAPL": MarketQuote(price=Decimal("190.5"), currency="USD")}
+    assert len(session.urls) == 1
+
+
+def test_spot_provider_splits_large_requests_into_chunks() -> None:
+    session = _DummySession(b"[]")
+    provider = SpotProvider(api_token="token", session=session)
+    tickers = [f"T{index:03d}" for index in range(120)]
+
+    quotes = _run(provider.get_quotes(tickers))
+
+    assert set(quotes) == set(tickers)
+    assert sorted(url.rsplit("/", 1)[1].count(",") + 1 for url in session.urls) == [20, 50, 50]
+
+
+def test_quote_cache_peek_skips_synthetic_fallback_quotes() -> None:
+    cache = QuoteCache(SpotProvider(), ttl=60)
+
+    quotes = _run(cache.get_quotes(["AAPL"]))
+
+    assert quotes["AAPL"].synthetic
+    assert cache.peek("AAPL") is None